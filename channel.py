@@ -2,6 +2,8 @@
 電磁波傳播模型模塊
 Electromagnetic wave propagation model (Channel)
 """
+import math
+
 import numpy as np
 from constants import C_LIGHT, EARTH_RADIUS
 
@@ -15,14 +17,43 @@ class Channel:
         計算兩個 3D 座標點之間的歐幾里得距離 (m)
         Calculate Euclidean distance between two 3D coordinates
         
+        對 3 元素座標直接展開平方和，避免小陣列建構與
+        np.linalg.norm 的呼叫開銷。
+
         :param coord1: (x, y, z) tuple/list/array
         :param coord2: (x, y, z) tuple/list/array
         :return: 距離 (米)
         """
-        coord1 = np.array(coord1)
-        coord2 = np.array(coord2)
-        return np.linalg.norm(coord1 - coord2)
+        dx = coord1[0] - coord2[0]
+        dy = coord1[1] - coord2[1]
+        dz = coord1[2] - coord2[2]
+        return math.sqrt(dx * dx + dy * dy + dz * dz)
     
+    @staticmethod
+    def calc_distance_batch(coords_a, coords_b):
+        """
+        批次計算兩組 3D 座標之間的所有成對距離 (m)
+        Calculate all pairwise distances between two sets of 3D coordinates
+
+        :param coords_a: (Na, 3) ndarray
+        :param coords_b: (Nb, 3) ndarray
+        :return: (Na, Nb) 距離矩陣 (米)
+        """
+        coords_a = np.asarray(coords_a, dtype=float)
+        coords_b = np.asarray(coords_b, dtype=float)
+
+        # 展開式 d² = |a|² + |b|² - 2a·b：交叉項走 BLAS GEMM，
+        # 不 materialize (Na, Nb, 3) 差值張量，中間記憶體從 3·Na·Nb
+        # 降為 Na·Nb；數值誤差以 maximum(…, 0) 夾住
+        # Expanded form routes the cross term through BLAS GEMM and
+        # avoids the (Na, Nb, 3) difference tensor
+        a2 = np.einsum('ij,ij->i', coords_a, coords_a)
+        b2 = np.einsum('ij,ij->i', coords_b, coords_b)
+        d2 = a2[:, None] + b2[None, :]
+        d2 -= 2.0 * (coords_a @ coords_b.T)
+        np.maximum(d2, 0.0, out=d2)
+        return np.sqrt(d2, out=d2)
+
     @staticmethod
     def calc_free_space_path_loss_db(distance_m, frequency_hz):
         """
@@ -38,10 +69,24 @@ class Channel:
         if distance_m <= 0:
             return float('inf')
         
-        ratio = (4 * np.pi * distance_m * frequency_hz) / C_LIGHT
-        fspl_db = 20 * np.log10(ratio)
+        ratio = (4 * math.pi * distance_m * frequency_hz) / C_LIGHT
+        fspl_db = 20 * math.log10(ratio)
         return fspl_db
     
+    @staticmethod
+    def fspl_db_from_distance(distance_m, fspl_const_db):
+        """
+        以預計算的頻率常數項計算 FSPL (dB)
+        Calculate FSPL from a precomputed frequency constant
+
+        FSPL = 20*log10(d) + 20*log10(4πf/c)，後者由發射源預先算好。
+
+        :param distance_m: 距離 (米)，標量或陣列
+        :param fspl_const_db: 頻率常數項 20log10(4πf/c) (dB)
+        :return: 路徑損耗 (dB)
+        """
+        return 20 * np.log10(distance_m) + fspl_const_db
+
     @staticmethod
     def get_atmospheric_loss_db(distance_m, altitude_m):
         """
@@ -56,20 +101,37 @@ class Channel:
             # 簡化：假設在 X/Ku 頻段，天頂方向為 1-3 dB
             base_loss = 2.0  # dB
             loss = base_loss * (distance_m / 600e3)
-            return np.clip(loss, 1.0, 5.0)  # 限制在 1 dB 到 5 dB 之間
+            return min(max(loss, 1.0), 5.0)  # 限制在 1 dB 到 5 dB 之間
         else:  # 無人機到地面 (平流層到地面)
             # 距離短，主要損耗來自對流層底部，假設恆定小值
             return 0.5  # dB
     
     @staticmethod
-    def calculate_link_budget(tx_coord, rx_coord, tx_power_dbw, tx_gain_db, 
+    def get_atmospheric_loss_db_batch(distance_m, tx_altitude_m):
+        """
+        批次估算大氣衰減 (L_atm) (dB)
+        Estimate atmospheric attenuation for a batch of links
+
+        :param distance_m: 距離矩陣 (Nt, Nr) (米)
+        :param tx_altitude_m: 發射源高度 (Nt,) (米)
+        :return: 大氣衰減 (Nt, Nr) (dB)
+        """
+        sat_loss = np.clip(2.0 * (distance_m / 600e3), 1.0, 5.0)
+        return np.where(
+            np.asarray(tx_altitude_m)[:, None] > 100000.0, sat_loss, 0.5)
+
+    @staticmethod
+    def calculate_link_budget(tx_coord, rx_coord, tx_power_dbw, tx_gain_db,
                              rx_gain_db, frequency_hz):
         """
         計算完整的鏈路預算，得到接收功率 P_Rx (dBW)
         Calculate complete link budget
-        
+
         P_Rx = P_Tx + G_Tx + G_Rx - L_FSPL - L_Atm
-        
+
+        單對 (tx, rx) 的便利介面；熱循環請改用
+        `calculate_link_budget_batch`，一次算完所有配對。
+
         :param tx_coord: 發射源座標 (x, y, z)
         :param rx_coord: 接收點座標 (x, y, z)
         :param tx_power_dbw: 發射功率 (dBW)
@@ -85,15 +147,62 @@ class Channel:
         fspl_db = Channel.calc_free_space_path_loss_db(distance_m, frequency_hz)
         
         # 3. 估算大氣衰減 (使用發射源高度進行判斷)
-        tx_altitude = np.linalg.norm(tx_coord) - EARTH_RADIUS
+        tx_altitude = math.sqrt(tx_coord[0] ** 2 + tx_coord[1] ** 2 +
+                                tx_coord[2] ** 2) - EARTH_RADIUS
         atm_loss_db = Channel.get_atmospheric_loss_db(distance_m, tx_altitude)
         
         # 4. 鏈路預算計算
-        P_rx_dbw = (tx_power_dbw + 
-                    tx_gain_db + 
-                    rx_gain_db - 
-                    fspl_db - 
+        P_rx_dbw = (tx_power_dbw +
+                    tx_gain_db +
+                    rx_gain_db -
+                    fspl_db -
                     atm_loss_db)
-        
+
+        return P_rx_dbw, distance_m
+
+    @staticmethod
+    def calculate_link_budget_batch(tx_coords, rx_coords, tx_power_dbw,
+                                    tx_gain_db, rx_gain_db, frequency_hz,
+                                    fspl_const_db=None):
+        """
+        批次計算鏈路預算：一組發射源對一組接收點
+        Calculate link budget for a set of transmitters against a set of receivers
+
+        與 `calculate_link_budget` 相同的模型，但以 NumPy 廣播一次算完
+        所有 (tx, rx) 配對，避免逐對的 Python 呼叫開銷。
+
+        :param tx_coords: 發射源座標 (Nt, 3) ndarray
+        :param rx_coords: 接收點座標 (Nr, 3) ndarray
+        :param tx_power_dbw: 發射功率 (dBW)
+        :param tx_gain_db: 發射天線增益 (dB)
+        :param rx_gain_db: 接收天線增益 (dB)，標量或 (Nr,) 陣列
+        :param frequency_hz: 頻率 (Hz)
+        :param fspl_const_db: 預計算的頻率常數項 20log10(4πf/c)；
+            省略時由 frequency_hz 現算
+        :return: (接收功率 P_Rx (Nt, Nr) ndarray (dBW), 距離 (Nt, Nr) ndarray (米))
+        """
+        tx_coords = np.asarray(tx_coords, dtype=float)
+        rx_coords = np.asarray(rx_coords, dtype=float)
+
+        # 1. 所有成對距離
+        distance_m = Channel.calc_distance_batch(tx_coords, rx_coords)
+
+        # 2. 路徑損耗：頻率相關常數提出，矩陣上只剩一個 log10
+        if fspl_const_db is None:
+            fspl_const_db = 20 * np.log10(4 * np.pi * frequency_hz / C_LIGHT)
+        fspl_db = 20 * np.log10(distance_m) + fspl_const_db
+
+        # 3. 大氣衰減 (依發射源高度分衛星/無人機兩種情況)
+        tx_altitude = np.linalg.norm(tx_coords, axis=1) - EARTH_RADIUS
+        atm_loss_db = Channel.get_atmospheric_loss_db_batch(
+            distance_m, tx_altitude)
+
+        # 4. 鏈路預算計算
+        P_rx_dbw = (tx_power_dbw +
+                    tx_gain_db +
+                    np.asarray(rx_gain_db) -
+                    fspl_db -
+                    atm_loss_db)
+
         return P_rx_dbw, distance_m
 
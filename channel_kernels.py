@@ -0,0 +1,314 @@
+"""
+鏈路預算 JIT 核心模塊：每步 SINR 計算的 Numba 加速核心
+JIT-compiled link-budget kernels for the per-step SINR computation
+
+Numba 為可選依賴：缺少時 `step_kernel` 退化為純 Python/NumPy 執行，
+Simulation 會改用向量化的 NumPy 路徑。
+Numba is optional: without it the decorator is a no-op and Simulation
+falls back to the vectorized NumPy path.
+"""
+import os
+
+import numpy as np
+from constants import C_LIGHT, EARTH_RADIUS
+
+# numexpr 為可選依賴：無 numba 時用它評估廣播運算式，
+# 多執行緒且不產生中間陣列
+# numexpr is optional: without numba it evaluates the broadcast
+# expressions multi-threaded and without intermediate arrays
+try:
+    import numexpr as ne
+    ne.set_num_threads(os.cpu_count() or 1)
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    ne = None
+    NUMEXPR_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """無 numba 時的替代裝飾器（不做任何事）"""
+        def wrap(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return wrap
+
+
+# dB↔線性轉換常數：10**(x/10) == exp(x·ln10/10)，exp 比 pow 便宜
+# dB<->linear constants: 10**(x/10) == exp(x*ln10/10); exp beats pow
+LN10_DIV_10 = np.log(10.0) / 10.0
+TEN_DIV_LN10 = 10.0 / np.log(10.0)
+
+
+def _fused_link_budget_numpy(tx_pos, rx_pos, const_db):
+    """fused_link_budget 的 NumPy 後備實作：以就地運算重用同一塊緩衝"""
+    diff = tx_pos[:, None, :] - rx_pos[None, :, :]
+    out = np.einsum('ijk,ijk->ij', diff, diff)
+    np.sqrt(out, out=out)  # out 此時是距離 (米)
+
+    tx_altitude = np.sqrt(
+        np.einsum('ij,ij->i', tx_pos, tx_pos)) - EARTH_RADIUS
+    high_altitude = tx_altitude[:, None] > 100000.0
+
+    if NUMEXPR_AVAILABLE:
+        return ne.evaluate(
+            'const_db - 20.0 * log10(d) - '
+            'where(high, where(atm < 1.0, 1.0, where(atm > 5.0, 5.0, atm)),'
+            ' 0.5)',
+            local_dict={'d': out,
+                        'atm': 2.0 * (out / 600e3),
+                        'high': high_altitude,
+                        'const_db': const_db[None, :]})
+
+    atm_db = np.where(high_altitude,
+                      np.clip(2.0 * (out / 600e3), 1.0, 5.0), 0.5)
+    np.log10(out, out=out)
+    out *= -20.0
+    out += const_db[None, :]
+    out -= atm_db
+    return out
+
+
+def db_to_linear(x_db):
+    """
+    dB → 線性轉換：10**(x/10)，以 exp 實作並在可用時交給 numexpr
+    dB to linear conversion via exp, delegated to numexpr when available
+    """
+    if NUMEXPR_AVAILABLE:
+        c = LN10_DIV_10
+        return ne.evaluate('exp(x_db * c)')
+    return np.exp(x_db * LN10_DIV_10)
+
+
+@njit(cache=True, fastmath=True)
+def _fused_link_budget_jit(tx_pos, rx_pos, const_db):
+    """fused_link_budget 的 Numba 實作：單一迴圈，無中間矩陣"""
+    Nt = tx_pos.shape[0]
+    Nr = rx_pos.shape[0]
+    out = np.empty((Nt, Nr))
+
+    for i in range(Nt):
+        alt = np.sqrt(tx_pos[i, 0] ** 2 + tx_pos[i, 1] ** 2 +
+                      tx_pos[i, 2] ** 2) - EARTH_RADIUS
+        high_altitude = alt > 100000.0
+        for j in range(Nr):
+            dx = tx_pos[i, 0] - rx_pos[j, 0]
+            dy = tx_pos[i, 1] - rx_pos[j, 1]
+            dz = tx_pos[i, 2] - rx_pos[j, 2]
+            d = np.sqrt(dx * dx + dy * dy + dz * dz)
+
+            if high_altitude:
+                atm_db = 2.0 * (d / 600e3)
+                if atm_db < 1.0:
+                    atm_db = 1.0
+                elif atm_db > 5.0:
+                    atm_db = 5.0
+            else:
+                atm_db = 0.5
+
+            out[i, j] = const_db[j] - 20.0 * np.log10(d) - atm_db
+    return out
+
+
+def fused_link_budget(tx_pos, rx_pos, const_db):
+    """
+    融合的鏈路預算計算：距離 + FSPL + 大氣衰減一次完成
+    Fused link budget: distance + FSPL + atmospheric loss in one pass
+
+    讀一次座標、寫一次結果，不 materialize 距離/損耗中間矩陣。
+
+    :param tx_pos: 發射源 ECEF 座標 (Nt, 3)
+    :param rx_pos: 接收點 ECEF 座標 (Nr, 3)
+    :param const_db: 與距離無關的常數項 (Nr,)，
+        即 P_tx + G_tx + G_rx - 20log10(4πf/c)
+    :return: 接收功率 P_Rx (Nt, Nr) (dBW)
+    """
+    if NUMBA_AVAILABLE:
+        return _fused_link_budget_jit(tx_pos, rx_pos, const_db)
+    return _fused_link_budget_numpy(tx_pos, rx_pos, const_db)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def count_jammed(gt_pos, gt_rx_gain_db, p_rx_sat_dbw, gt_noise_w,
+                 uav_pos, jam_const_db, jam_freq_hz, sinr_threshold_db):
+    """
+    計算被阻斷的地面終端數量（無人機適應度核心）
+    Count jammed ground terminals (UAV fitness kernel)
+
+    衛星訊號 P_rx 由呼叫端預先算好傳入；本核心只對每個終端
+    串流疊加所有無人機的干擾功率並做閾值比較，距離、FSPL、
+    大氣衰減與 dB↔線性轉換全部融合在單一迴圈內，無中間矩陣。
+
+    :param gt_pos: 地面終端 ECEF 座標 (Ng, 3)
+    :param gt_rx_gain_db: 地面終端接收增益 (Ng,)
+    :param p_rx_sat_dbw: 各終端的最強衛星訊號 (Ng,) (dBW)
+    :param gt_noise_w: 地面終端噪聲功率 (Ng,) (W)
+    :param uav_pos: 無人機 ECEF 座標 (Nu, 3)
+    :param jam_const_db: 干擾發射功率 + 增益 (dBW + dB)
+    :param jam_freq_hz: 干擾頻率 (Hz)
+    :param sinr_threshold_db: 阻斷閾值 (dB)
+    :return: 被阻斷的終端數 (int)
+    """
+    Ng = gt_pos.shape[0]
+    Nu = uav_pos.shape[0]
+
+    four_pi_f_jam = 4.0 * np.pi * jam_freq_hz / C_LIGHT
+
+    count = 0
+    # 各終端互不相依，prange 將外層迴圈分配到多核心並歸約 count
+    for g in prange(Ng):
+        gx = gt_pos[g, 0]
+        gy = gt_pos[g, 1]
+        gz = gt_pos[g, 2]
+
+        # 只需要布林的阻斷判定，不需要 SINR 值本身：
+        # sinr < thr ⟺ J_W > 10**((P_rx_sat - thr)/10) - N_W，
+        # 干擾功率和一越過此閾值即可提前跳出內循環
+        # Only the boolean jammed flag is needed; once the accumulated
+        # jam power crosses the equivalent threshold, stop summing
+        jam_threshold_w = (np.exp((p_rx_sat_dbw[g] - sinr_threshold_db) *
+                                  LN10_DIV_10) - gt_noise_w[g])
+
+        J_W = 0.0
+        for u in range(Nu):
+            dx = uav_pos[u, 0] - gx
+            dy = uav_pos[u, 1] - gy
+            dz = uav_pos[u, 2] - gz
+            d = np.sqrt(dx * dx + dy * dy + dz * dz)
+
+            fspl_db = 20.0 * np.log10(four_pi_f_jam * d)
+
+            alt = np.sqrt(uav_pos[u, 0] ** 2 + uav_pos[u, 1] ** 2 +
+                          uav_pos[u, 2] ** 2) - EARTH_RADIUS
+            if alt > 100000.0:
+                atm_db = 2.0 * (d / 600e3)
+                if atm_db < 1.0:
+                    atm_db = 1.0
+                elif atm_db > 5.0:
+                    atm_db = 5.0
+            else:
+                atm_db = 0.5
+
+            p = jam_const_db + gt_rx_gain_db[g] - fspl_db - atm_db
+            J_W += np.exp(p * LN10_DIV_10)
+            if J_W > jam_threshold_w:
+                break
+
+        if J_W > jam_threshold_w:
+            count += 1
+
+    return count
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def step_kernel(sat_pos, sat_tx_power_dbw, sat_tx_gain_db, sat_freq_hz,
+                uav_pos, jam_power_dbw, jam_gain_db, jam_freq_hz,
+                gt_pos, gt_rx_gain_db, gt_noise_dbw, sinr_threshold_db):
+    """
+    單一時間步的鏈路預算 + SINR 核心
+    Single-time-step link-budget + SINR kernel
+
+    以顯式迴圈融合距離、FSPL、大氣衰減與 dB↔線性轉換，
+    避免廣播運算產生的中間矩陣。
+
+    :param sat_pos: 衛星 ECEF 座標 (Ns, 3)
+    :param sat_tx_power_dbw: 衛星發射功率 (dBW)
+    :param sat_tx_gain_db: 衛星發射增益 (dB)
+    :param sat_freq_hz: 衛星頻率 (Hz)
+    :param uav_pos: 無人機 ECEF 座標 (Nu, 3)
+    :param jam_power_dbw: 干擾發射功率 (dBW)
+    :param jam_gain_db: 干擾發射增益 (dB)
+    :param jam_freq_hz: 干擾頻率 (Hz)
+    :param gt_pos: 地面終端 ECEF 座標 (Ng, 3)
+    :param gt_rx_gain_db: 地面終端接收增益 (Ng,)
+    :param gt_noise_dbw: 地面終端噪聲功率 (Ng,) (dBW)
+    :param sinr_threshold_db: 阻斷閾值 (dB)
+    :return: (sinr (Ng,), p_rx (Ng,), j_total (Ng,), is_jammed (Ng,))
+    """
+    Ns = sat_pos.shape[0]
+    Nu = uav_pos.shape[0]
+    Ng = gt_pos.shape[0]
+
+    sinr = np.empty(Ng)
+    p_rx = np.empty(Ng)
+    j_total = np.empty(Ng)
+    is_jammed = np.empty(Ng, dtype=np.bool_)
+
+    four_pi_f_sat = 4.0 * np.pi * sat_freq_hz / C_LIGHT
+    four_pi_f_jam = 4.0 * np.pi * jam_freq_hz / C_LIGHT
+
+    # 各終端互不相依，prange 讓 numba 將外層迴圈分配到多核心
+    # Terminals are independent; prange spreads the outer loop over cores
+    for g in prange(Ng):
+        gx = gt_pos[g, 0]
+        gy = gt_pos[g, 1]
+        gz = gt_pos[g, 2]
+        rx_gain = gt_rx_gain_db[g]
+
+        # a. 衛星訊號：取最強者
+        best_p_rx = -np.inf
+        for s in range(Ns):
+            dx = sat_pos[s, 0] - gx
+            dy = sat_pos[s, 1] - gy
+            dz = sat_pos[s, 2] - gz
+            d = np.sqrt(dx * dx + dy * dy + dz * dz)
+
+            fspl_db = 20.0 * np.log10(four_pi_f_sat * d)
+
+            alt = np.sqrt(sat_pos[s, 0] ** 2 + sat_pos[s, 1] ** 2 +
+                          sat_pos[s, 2] ** 2) - EARTH_RADIUS
+            if alt > 100000.0:
+                atm_db = 2.0 * (d / 600e3)
+                if atm_db < 1.0:
+                    atm_db = 1.0
+                elif atm_db > 5.0:
+                    atm_db = 5.0
+            else:
+                atm_db = 0.5
+
+            p = sat_tx_power_dbw + sat_tx_gain_db + rx_gain - fspl_db - atm_db
+            if p > best_p_rx:
+                best_p_rx = p
+        p_rx[g] = best_p_rx
+
+        # b. 干擾訊號：線性疊加所有無人機
+        J_W = 0.0
+        for u in range(Nu):
+            dx = uav_pos[u, 0] - gx
+            dy = uav_pos[u, 1] - gy
+            dz = uav_pos[u, 2] - gz
+            d = np.sqrt(dx * dx + dy * dy + dz * dz)
+
+            fspl_db = 20.0 * np.log10(four_pi_f_jam * d)
+
+            alt = np.sqrt(uav_pos[u, 0] ** 2 + uav_pos[u, 1] ** 2 +
+                          uav_pos[u, 2] ** 2) - EARTH_RADIUS
+            if alt > 100000.0:
+                atm_db = 2.0 * (d / 600e3)
+                if atm_db < 1.0:
+                    atm_db = 1.0
+                elif atm_db > 5.0:
+                    atm_db = 5.0
+            else:
+                atm_db = 0.5
+
+            p = jam_power_dbw + jam_gain_db + rx_gain - fspl_db - atm_db
+            J_W += np.exp(p * LN10_DIV_10)
+
+        if J_W > 0.0:
+            j_total[g] = np.log(J_W) * TEN_DIV_LN10
+        else:
+            j_total[g] = -np.inf
+
+        # c. SINR = P_rx(dBW) - 10*log10(J_W + N_W)
+        N_W = np.exp(gt_noise_dbw[g] * LN10_DIV_10)
+        sinr[g] = best_p_rx - np.log(J_W + N_W) * TEN_DIV_LN10
+        is_jammed[g] = sinr[g] < sinr_threshold_db
+
+    return sinr, p_rx, j_total, is_jammed
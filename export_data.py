@@ -3,16 +3,35 @@
 Data export module: Export simulation results to JSON for web visualization
 """
 import json
+import os
 import numpy as np
 from datetime import datetime
 
+# orjson 為可選依賴：C 實作的序列化器，能直接序列化 numpy 陣列，
+# 比標準 json 快數倍；缺少時退回標準 json
+# orjson is optional: its C serializer handles numpy arrays natively and
+# is several times faster than the stdlib json; fall back when missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(obj):
+    """標準 json 後備路徑的 numpy 型別轉換"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
 
 def export_simulation_data(results, satellites, uav_swarm, ground_terminals,
                          output_file='simulation_data.json'):
     """
     導出模擬數據為 JSON 格式
     Export simulation data to JSON format
-    
+
     :param results: 模擬結果列表
     :param satellites: 衛星列表
     :param uav_swarm: 無人機蜂群實例
@@ -37,7 +56,7 @@ def export_simulation_data(results, satellites, uav_swarm, ground_terminals,
         'ground_terminals': [],
         'time_steps': []
     }
-    
+
     # 導出衛星信息
     for i, sat in enumerate(satellites):
         export_data['satellites'].append({
@@ -47,7 +66,7 @@ def export_simulation_data(results, satellites, uav_swarm, ground_terminals,
             'tx_gain_db': sat.tx_gain_db,
             'frequency_hz': sat.frequency_hz
         })
-    
+
     # 導出地面終端信息
     for gt in ground_terminals:
         gt_info = {
@@ -55,7 +74,7 @@ def export_simulation_data(results, satellites, uav_swarm, ground_terminals,
             'latitude': float(gt.latitude),
             'longitude': float(gt.longitude),
             'rx_gain_db': float(gt.G_R_dB),
-            'ecef': gt.get_ecef_coord().tolist()
+            'ecef': gt.get_ecef_coord()
         }
         # 添加名稱和類型（如果存在）
         if hasattr(gt, 'name'):
@@ -63,41 +82,37 @@ def export_simulation_data(results, satellites, uav_swarm, ground_terminals,
         if hasattr(gt, 'type'):
             gt_info['type'] = gt.type
         export_data['ground_terminals'].append(gt_info)
-    
+
     # 導出每個時間步的數據
+    # 位置陣列不做逐元素 tolist()，交給序列化器一次處理
     for result in results:
         time_step_data = {
             'time': float(result['time']),
-            'satellite_positions': [
-                pos.tolist() if isinstance(pos, np.ndarray) else pos
-                for pos in result['satellite_positions']
-            ],
-            'uav_positions': result['uav_positions'].tolist(),
+            'satellite_positions': np.asarray(result['satellite_positions']),
+            'uav_positions': result['uav_positions'],
             'avg_sinr': float(result['avg_sinr']),
             'jammed_rate': float(result['jammed_rate']),
             'jammed_count': int(result['jammed_count']),
-            'ground_terminal_results': []
+            'ground_terminal_results': result['gt_results']
         }
-        
-        # 導出每個地面終端的結果
-        for gt_result in result['gt_results']:
-            time_step_data['ground_terminal_results'].append({
-                'gt_id': int(gt_result['gt_id']),
-                'sinr': float(gt_result['sinr']),
-                'p_rx': float(gt_result['p_rx']),
-                'j_total': float(gt_result['j_total']),
-                'is_jammed': bool(gt_result['is_jammed'])
-            })
-        
         export_data['time_steps'].append(time_step_data)
-    
-    # 保存為 JSON 文件
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(export_data, f, indent=2, ensure_ascii=False)
-    
+
+    # 保存為 JSON 文件（單次序列化，檔案大小直接取序列化結果長度）
+    if orjson is not None:
+        data_bytes = orjson.dumps(
+            export_data,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2)
+        with open(output_file, 'wb') as f:
+            f.write(data_bytes)
+        size_kb = len(data_bytes) / 1024
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False,
+                      default=_json_default)
+        size_kb = os.path.getsize(output_file) / 1024
+
     print(f"✓ 數據已導出到: {output_file}")
     print(f"  - 時間步數: {len(results)}")
-    print(f"  - 文件大小: {len(json.dumps(export_data)) / 1024:.2f} KB")
-    
-    return output_file
+    print(f"  - 文件大小: {size_kb:.2f} KB")
 
+    return output_file
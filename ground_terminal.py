@@ -35,6 +35,9 @@ class GroundTerminal:
         
         # 預計算 ECEF 座標
         self.ecef_coord = geo_to_ecef(latitude, longitude, altitude=0.0)
+
+        # 預計算線性噪聲功率 (W)，供線性域的 SINR 計算使用
+        self.N_W = 10 ** (self.N_dBW / 10)
     
     def get_ecef_coord(self):
         """返回 ECEF 座標"""
@@ -67,7 +70,7 @@ class GroundTerminal:
             sinr_dB = -float('inf')
         
         return sinr_dB
-    
+
     def is_jammed(self, sinr_dB,
                   threshold_dB=SINR_THRESHOLD_DB):
         """
@@ -3,10 +3,53 @@
 Satellite module: LEO satellite orbit calculation using SGP4
 """
 import datetime
+import math
+
 import numpy as np
 from skyfield.api import load, EarthSatellite
 from constants import (SAT_TX_POWER_DBW, SAT_TX_GAIN_DB, SAT_FREQ,
-                       SIM_START_TIME)
+                       SIM_START_TIME, C_LIGHT)
+
+# sgp4 是 skyfield 自身的依賴；其 C 加速的 Satrec.sgp4_array 可一次
+# 傳播整段時間序列，比經過 skyfield 包裝層快得多
+# sgp4 ships as a skyfield dependency; its C-accelerated
+# Satrec.sgp4_array propagates a whole time series per call, much faster
+# than going through the skyfield wrapper layer
+try:
+    from sgp4.api import Satrec, jday
+    SGP4_AVAILABLE = True
+except ImportError:
+    SGP4_AVAILABLE = False
+
+# 模塊層級共用的時間刻度：load.timescale() 需要解析星曆數據，
+# 只載入一次並由所有衛星實例共用
+# Module-level shared timescale: load.timescale() parses ephemeris data,
+# load it once and share it across all Satellite instances
+_TIMESCALE = None
+
+
+def get_timescale():
+    """返回共用的 skyfield 時間刻度（惰性載入一次）"""
+    global _TIMESCALE
+    if _TIMESCALE is None:
+        _TIMESCALE = load.timescale()
+    return _TIMESCALE
+
+
+def _gmst_rad(jd_ut1):
+    """
+    計算格林威治平恆星時 (GMST)，弧度
+    Greenwich Mean Sidereal Time in radians (IAU 1982 model)
+
+    :param jd_ut1: UT1 儒略日 (標量或 ndarray)
+    :return: GMST (弧度)
+    """
+    t_ut1 = (jd_ut1 - 2451545.0) / 36525.0
+    gmst_sec = (67310.54841 +
+                (876600.0 * 3600.0 + 8640184.812866) * t_ut1 +
+                0.093104 * t_ut1 ** 2 -
+                6.2e-6 * t_ut1 ** 3)
+    return (gmst_sec % 86400.0) * (np.pi / 43200.0)
 
 
 class Satellite:
@@ -29,14 +72,22 @@ class Satellite:
         """
         self.name = name
         
-        # 載入時間刻度數據，並創建衛星物件
-        ts = load.timescale()
+        # 使用共用時間刻度創建衛星物件
+        ts = get_timescale()
         self.sat = EarthSatellite(tle_line1, tle_line2, name, ts)
+
+        # 批次傳播用的原生 SGP4 物件 (C 實作)
+        self.satrec = (Satrec.twoline2rv(tle_line1, tle_line2)
+                       if SGP4_AVAILABLE else None)
         
         # 通訊參數
         self.tx_power_dbw = tx_power_dbw
         self.tx_gain_db = tx_gain_db
         self.frequency_hz = frequency_hz
+
+        # FSPL 的頻率常數項 20log10(4πf/c)，頻率固定故只算一次
+        self.fspl_const_db = 20 * math.log10(
+            4 * math.pi * frequency_hz / C_LIGHT)
         
         # 解析模擬開始時間
         self.t0 = datetime.datetime.strptime(
@@ -53,9 +104,9 @@ class Satellite:
         """
         # 1. 創建時間物件
         current_dt = self.t0 + datetime.timedelta(seconds=current_time)
-        
-        # 載入 skyfield 的時間刻度
-        ts = load.timescale()
+
+        # 使用共用的 skyfield 時間刻度
+        ts = get_timescale()
         t = ts.utc(current_dt.year, current_dt.month, current_dt.day,
                    current_dt.hour, current_dt.minute, current_dt.second)
         
@@ -68,7 +119,45 @@ class Satellite:
         x_m, y_m, z_m = geocentric.itrf_xyz().m
         
         return np.array([x_m, y_m, z_m])
-    
+
+    def update_positions_batch(self, time_offsets_sec):
+        """
+        批次計算衛星在多個時間點的 ECEF 座標
+        Calculate satellite ECEF coordinates at multiple times in one call
+
+        優先使用 sgp4 的 C 實作 Satrec.sgp4_array 一次傳播所有時間點，
+        再以 GMST 旋轉將 TEME 轉為 ECEF（忽略極移，與本模擬的球形地球
+        模型一致）；sgp4 不可用時退回 skyfield 的向量化路徑。
+
+        :param time_offsets_sec: 從模擬開始經過的秒數序列
+        :return: ECEF 座標 (T, 3) ndarray in meters
+        """
+        dts = [self.t0 + datetime.timedelta(seconds=float(s))
+               for s in time_offsets_sec]
+
+        if self.satrec is not None:
+            jd = np.empty(len(dts))
+            fr = np.empty(len(dts))
+            for i, d in enumerate(dts):
+                jd[i], fr[i] = jday(d.year, d.month, d.day,
+                                    d.hour, d.minute,
+                                    d.second + d.microsecond * 1e-6)
+
+            _, r_teme_km, _ = self.satrec.sgp4_array(jd, fr)
+
+            # TEME → ECEF：繞 Z 軸旋轉 GMST
+            gmst = _gmst_rad(jd + fr)
+            cos_g = np.cos(gmst)
+            sin_g = np.sin(gmst)
+            x = cos_g * r_teme_km[:, 0] + sin_g * r_teme_km[:, 1]
+            y = -sin_g * r_teme_km[:, 0] + cos_g * r_teme_km[:, 1]
+            return np.column_stack([x, y, r_teme_km[:, 2]]) * 1000.0
+
+        ts = get_timescale()
+        t_vec = ts.from_datetimes(dts)
+        geocentric = self.sat.at(t_vec)
+        return geocentric.itrf_xyz().m.T
+
     def get_tx_parameters(self):
         """返回衛星的發射參數，供 Channel 模塊使用"""
         return self.tx_power_dbw, self.tx_gain_db, self.frequency_hz
@@ -5,6 +5,8 @@ Main simulation loop module
 import numpy as np
 from constants import DT, SINR_THRESHOLD_DB
 from channel import Channel
+from channel_kernels import (TEN_DIV_LN10, NUMBA_AVAILABLE, db_to_linear,
+                             fused_link_budget, step_kernel)
 from ground_terminal import GroundTerminal
 from satellite import Satellite
 from uav_swarm import UAVSwarm
@@ -34,8 +36,100 @@ class Simulation:
         self.dt = dt
         
         self.channel = Channel()
-        self.results = []
-    
+
+        self._pack_arrays()
+
+        # 預分配整場模擬的結果張量，主循環以索引寫入；
+        # 字典列表形式的 results 僅在被讀取時惰性建立
+        # Preallocate result tensors for the whole run and write by index;
+        # the list-of-dicts view is built lazily on first access
+        # 歷史張量以 float32 儲存：dB 值的精度損失 < 0.01 dB，
+        # ECEF 位置約 0.5 m，對本模擬的物理尺度綽綽有餘；
+        # 記憶體流量減半。計算本身仍以 float64 進行。
+        # History tensors are stored as float32: < 0.01 dB loss for dB
+        # values and ~0.5 m for ECEF positions, ample for this model,
+        # at half the memory traffic. Computation stays in float64.
+        self.T = len(np.arange(t_start, t_end, dt))
+        num_sats = len(satellites)
+        num_gts = len(ground_terminals)
+        self.time_hist = np.empty(self.T)
+        self.sat_pos_hist = np.empty((self.T, num_sats, 3),
+                                     dtype=np.float32)
+        self.uav_pos_hist = np.empty((self.T, uav_swarm.num_uavs, 3),
+                                     dtype=np.float32)
+        self.sinr_hist = np.empty((self.T, num_gts), dtype=np.float32)
+        self.p_rx_hist = np.empty((self.T, num_gts), dtype=np.float32)
+        self.j_total_hist = np.empty((self.T, num_gts), dtype=np.float32)
+        self.is_jammed_hist = np.empty((self.T, num_gts), dtype=bool)
+        self.avg_sinr_hist = np.empty(self.T, dtype=np.float32)
+        self.jammed_count_hist = np.empty(self.T, dtype=np.int64)
+        self._num_steps = 0
+        self._results_cache = None
+
+        # 預熱 JIT 核心，讓編譯成本不落在第一個真實時間步上
+        # Warm up the JIT kernel so compilation cost is paid here, not
+        # on the first real time step
+        if NUMBA_AVAILABLE:
+            dummy = np.zeros((1, 3))
+            step_kernel(dummy + 7e6, 0.0, 0.0, 1e9,
+                        dummy + 6.4e6, 0.0, 0.0, 1e9,
+                        dummy + 6.4e6, np.zeros(1), np.zeros(1), 0.0)
+
+    def _pack_arrays(self):
+        """
+        將地面終端的常數屬性打包為 Struct-of-Arrays 連續陣列
+        Pack constant ground-terminal attributes into Struct-of-Arrays form
+
+        內循環只讀取這些陣列，GroundTerminal 物件僅保留給外部檢視使用。
+        The inner loop reads only these arrays; the GroundTerminal objects
+        are kept for external introspection only.
+        """
+        gts = self.ground_terminals
+        self._num_gts = len(gts)
+        self.gt_ids = np.array([gt.id for gt in gts], dtype=np.int64)
+        self.gt_ecef = np.ascontiguousarray(
+            np.stack([gt.get_ecef_coord() for gt in gts]))
+        self.gt_rx_gain = np.array([gt.G_R_dB for gt in gts], dtype=float)
+        self.gt_noise_dbw = np.array([gt.N_dBW for gt in gts], dtype=float)
+        # 線性噪聲功率 (W)，避免每步重複 dB→W 轉換
+        self.gt_noise_w = 10 ** (self.gt_noise_dbw / 10)
+
+    @property
+    def results(self):
+        """
+        以字典列表形式呈現的模擬結果（由預分配張量惰性建立）
+        Simulation results as a list of dicts, built lazily from the
+        preallocated history tensors
+        """
+        if self._results_cache is None:
+            self._results_cache = self._build_results()
+        return self._results_cache
+
+    def _build_results(self):
+        """從歷史張量組裝字典列表形式的結果"""
+        num_gts = len(self.ground_terminals)
+        results = []
+        for i in range(self._num_steps):
+            gt_results = []
+            for g in range(num_gts):
+                gt_results.append({
+                    'gt_id': int(self.gt_ids[g]),
+                    'sinr': float(self.sinr_hist[i, g]),
+                    'p_rx': float(self.p_rx_hist[i, g]),
+                    'j_total': float(self.j_total_hist[i, g]),
+                    'is_jammed': bool(self.is_jammed_hist[i, g])
+                })
+            results.append({
+                'time': float(self.time_hist[i]),
+                'satellite_positions': self.sat_pos_hist[i],
+                'uav_positions': self.uav_pos_hist[i],
+                'gt_results': gt_results,
+                'avg_sinr': float(self.avg_sinr_hist[i]),
+                'jammed_count': int(self.jammed_count_hist[i]),
+                'jammed_rate': float(self.jammed_count_hist[i]) / num_gts
+            })
+        return results
+
     def run(self, enable_optimization=True):
         """
         運行模擬主循環
@@ -55,105 +149,106 @@ class Simulation:
         print("=" * 60)
         
         time_steps = np.arange(self.t_start, self.t_end, self.dt)
-        
-        for step_idx, current_time in enumerate(time_steps):
+        self._num_steps = 0
+        self._results_cache = None
+
+        # 在主循環前一次批次傳播所有衛星軌道 (向量化 SGP4)
+        # Propagate all satellite orbits for the whole run in one batch call
+        sat_positions_all = [sat.update_positions_batch(time_steps)
+                             for sat in self.satellites]
+
+        # 假設所有衛星參數相同，取第一個
+        satellite_params = (self.satellites[0].get_tx_parameters()
+                            if self.satellites else None)
+
+        # 與距離無關的鏈路預算常數項：P_tx + G_tx + G_rx - 20log10(4πf/c)
+        # 整場模擬不變，提到時間循環外；每步每條鏈路只剩
+        # 20log10(d) 與大氣衰減隨距離變化
+        # Distance-independent link-budget terms are constant for the whole
+        # run; hoist them out of the time loop
+        jam_power, jam_gain, jam_freq = self.uav_swarm.get_jammer_params()
+        sat_tx_power, sat_tx_gain, sat_freq = satellite_params
+        sat_const_db = (sat_tx_power + sat_tx_gain + self.gt_rx_gain -
+                        self.satellites[0].fspl_const_db)
+        uav_const_db = (jam_power + jam_gain + self.gt_rx_gain -
+                        self.uav_swarm.fspl_const_db)
+
+        # 以整數索引驅動主循環，current_time 直接由步長推得，
+        # 避免逐步將 numpy 標量裝箱為 Python float
+        # Drive the loop by integer index; current_time derives from the
+        # step size without boxing numpy scalars per iteration
+        for step_idx in range(len(time_steps)):
+            current_time = self.t_start + step_idx * self.dt
             # --- 運動更新 ---
-            satellite_positions = []
-            satellite_params_list = []
-            
-            for sat in self.satellites:
-                sat_pos = sat.update_position(current_time)
-                satellite_positions.append(sat_pos)
-                satellite_params_list.append(sat.get_tx_parameters())
-            
-            # 假設所有衛星參數相同，取第一個
-            satellite_params = satellite_params_list[0] if satellite_params_list else None
+            satellite_positions = [pos_hist[step_idx]
+                                   for pos_hist in sat_positions_all]
             
             # --- 蜂群策略 (移動和優化) ---
-            # 每步都更新位置（飛行或優化）
-            jammed_count = self.uav_swarm.update_formation(
+            # 每步都更新位置（飛行或優化）；阻斷數由下方的鏈路計算統一得出
+            self.uav_swarm.update_formation(
                 self.ground_terminals,
                 satellite_positions,
                 satellite_params,
                 self.channel,
                 dt=self.dt
             )
-            if step_idx % 10 == 0:
-                print(f"時間 {current_time:.0f}s: {jammed_count}/{len(self.ground_terminals)} 個終端被阻斷")
-            
+
             # --- 鏈路計算 ---
-            step_results = {
-                'time': current_time,
-                'satellite_positions': satellite_positions.copy(),
-                'uav_positions': self.uav_swarm.uav_positions_ecef.copy(),
-                'gt_results': []
-            }
-            
-            avg_sinr = 0.0
-            jammed_count = 0
-            
-            for gt in self.ground_terminals:
-                # a. 衛星訊號計算 (P_rx)
-                P_rx_list = []
-                for sat_pos in satellite_positions:
-                    P_rx, _ = self.channel.calculate_link_budget(
-                        tx_coord=sat_pos,
-                        rx_coord=gt.get_ecef_coord(),
-                        tx_power_dbw=satellite_params[0],
-                        tx_gain_db=satellite_params[1],
-                        rx_gain_db=gt.G_R_dB,
-                        frequency_hz=satellite_params[2]
-                    )
-                    P_rx_list.append(P_rx)
-                
-                P_rx = max(P_rx_list)  # 假設終端鎖定最強的衛星訊號
-                
-                # b. 干擾訊號計算 (J_total)
-                J_total_W = 0.0
-                jam_power, jam_gain, jam_freq = self.uav_swarm.get_jammer_params()
-                
-                for uav_coord in self.uav_swarm.uav_positions_ecef:
-                    P_rx_uav, _ = self.channel.calculate_link_budget(
-                        tx_coord=uav_coord,
-                        rx_coord=gt.get_ecef_coord(),
-                        tx_power_dbw=jam_power,
-                        tx_gain_db=jam_gain,
-                        rx_gain_db=gt.G_R_dB,
-                        frequency_hz=jam_freq
-                    )
-                    J_total_W += 10**(P_rx_uav / 10)
-                
-                J_total_dbw = 10 * np.log10(J_total_W) if J_total_W > 0 else -float('inf')
-                
-                # c. 性能評估
-                sinr = gt.calculate_sinr(P_rx, J_total_dbw)
-                is_jammed = gt.is_jammed(sinr, SINR_THRESHOLD_DB)
-                
-                avg_sinr += sinr
-                if is_jammed:
-                    jammed_count += 1
-                
-                step_results['gt_results'].append({
-                    'gt_id': gt.id,
-                    'sinr': sinr,
-                    'p_rx': P_rx,
-                    'j_total': J_total_dbw,
-                    'is_jammed': is_jammed
-                })
-            
-            avg_sinr /= len(self.ground_terminals)
-            jammed_rate = jammed_count / len(self.ground_terminals)
-            
-            step_results['avg_sinr'] = avg_sinr
-            step_results['jammed_count'] = jammed_count
-            step_results['jammed_rate'] = jammed_rate
-            
-            self.results.append(step_results)
-            
+            sat_pos_arr = np.stack(satellite_positions)
+            uav_pos_arr = self.uav_swarm.uav_positions_ecef
+
+            if NUMBA_AVAILABLE:
+                # 融合核心：距離/FSPL/大氣衰減/SINR 一次算完，無中間矩陣
+                sinr, P_rx, J_total_dbw, is_jammed = step_kernel(
+                    sat_pos_arr, sat_tx_power, sat_tx_gain, sat_freq,
+                    uav_pos_arr, jam_power, jam_gain, jam_freq,
+                    self.gt_ecef, self.gt_rx_gain, self.gt_noise_dbw,
+                    SINR_THRESHOLD_DB)
+            else:
+                # NumPy 後備路徑：融合的距離 + FSPL + 大氣衰減單趟計算
+                # a. 衛星訊號計算 (P_rx)：所有 (衛星, 終端) 配對一次算完
+                P_rx_sat = fused_link_budget(
+                    sat_pos_arr, self.gt_ecef, sat_const_db)
+                P_rx = P_rx_sat.max(axis=0)  # 假設終端鎖定最強的衛星訊號
+
+                # b. 干擾訊號計算 (J_total)：所有 (無人機, 終端) 配對一次算完
+                P_rx_uav = fused_link_budget(
+                    uav_pos_arr, self.gt_ecef, uav_const_db)
+                # dB→W 以 exp 取代 pow：10**(x/10) == exp(x·ln10/10)
+                J_total_W = db_to_linear(P_rx_uav).sum(axis=0)
+
+                with np.errstate(divide='ignore'):
+                    J_total_dbw = np.where(
+                        J_total_W > 0,
+                        np.log(np.maximum(J_total_W, 1e-300)) * TEN_DIV_LN10,
+                        -np.inf)
+
+                # c. 性能評估：SINR(dB) = P_rx(dBW) - 10log10(J_W + N_W)，
+                # 不需先把 P_rx 轉回線性再取 log
+                sinr = (P_rx -
+                        np.log(J_total_W + self.gt_noise_w) * TEN_DIV_LN10)
+                is_jammed = sinr < SINR_THRESHOLD_DB
+
+            avg_sinr = float(sinr.mean())
+            jammed_count = int(is_jammed.sum())
+            jammed_rate = jammed_count / self._num_gts
+
+            # 以索引寫入預分配的歷史張量（寫入即快照，無需 .copy()）
+            self.time_hist[step_idx] = current_time
+            self.sat_pos_hist[step_idx] = sat_pos_arr
+            self.uav_pos_hist[step_idx] = uav_pos_arr
+            self.sinr_hist[step_idx] = sinr
+            self.p_rx_hist[step_idx] = P_rx
+            self.j_total_hist[step_idx] = J_total_dbw
+            self.is_jammed_hist[step_idx] = is_jammed
+            self.avg_sinr_hist[step_idx] = avg_sinr
+            self.jammed_count_hist[step_idx] = jammed_count
+            self._num_steps = step_idx + 1
+
             # 進度顯示
             if step_idx % 10 == 0:
                 print(f"時間 {current_time:6.0f}s | 平均 SINR: {avg_sinr:6.2f} dB | "
-                     f"阻斷率: {jammed_rate*100:5.1f}% ({jammed_count}/{len(self.ground_terminals)})")
+                     f"阻斷率: {jammed_rate*100:5.1f}% ({jammed_count}/{self._num_gts})")
         
         print("=" * 60)
         print("模擬完成！")
@@ -163,19 +258,21 @@ class Simulation:
     
     def get_summary_statistics(self):
         """獲取模擬統計摘要"""
-        if not self.results:
+        n = self._num_steps
+        if n == 0:
             return None
-        
-        avg_sinr_list = [r['avg_sinr'] for r in self.results]
-        jammed_rate_list = [r['jammed_rate'] for r in self.results]
-        
+
+        avg_sinr = self.avg_sinr_hist[:n]
+        jammed_rate = (self.jammed_count_hist[:n] /
+                       len(self.ground_terminals))
+
         return {
-            'avg_sinr_mean': np.mean(avg_sinr_list),
-            'avg_sinr_std': np.std(avg_sinr_list),
-            'avg_sinr_min': np.min(avg_sinr_list),
-            'avg_sinr_max': np.max(avg_sinr_list),
-            'jammed_rate_mean': np.mean(jammed_rate_list),
-            'jammed_rate_max': np.max(jammed_rate_list),
-            'total_steps': len(self.results)
+            'avg_sinr_mean': np.mean(avg_sinr),
+            'avg_sinr_std': np.std(avg_sinr),
+            'avg_sinr_min': np.min(avg_sinr),
+            'avg_sinr_max': np.max(avg_sinr),
+            'jammed_rate_mean': np.mean(jammed_rate),
+            'jammed_rate_max': np.max(jammed_rate),
+            'total_steps': n
         }
 
@@ -2,10 +2,86 @@
 無人機蜂群模塊：干擾優化策略
 UAV Swarm module: jamming optimization strategy
 """
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+from channel import Channel
 from constants import (UAV_ALTITUDE, UAV_JAM_POWER_DBW,
-                       UAV_JAM_GAIN_DB, UAV_FREQ)
-from utils import geo_to_ecef
+                       UAV_JAM_GAIN_DB, UAV_FREQ, C_LIGHT,
+                       SINR_THRESHOLD_DB)
+from channel_kernels import (LN10_DIV_10, TEN_DIV_LN10, NUMBA_AVAILABLE,
+                             count_jammed, njit)
+from utils import geo_to_ecef_batch
+
+# 配對數 (終端 × 無人機) 超過此值才值得跨行程平行化，
+# 否則序列化與行程通訊成本高於收益
+# Cross-process parallelism only pays off above this (terminals x UAVs)
+# pair count; below it pickling and IPC dominate
+_PARALLEL_THRESHOLD = 200_000
+
+
+def _fitness_worker(gt_ecef, gt_G_R, gt_N_W, p_rx_sat_dbw,
+                    uav_ecef, jam_power, jam_gain, jam_freq,
+                    sinr_threshold_db):
+    """
+    行程池工作函數：計算一段終端的被阻斷數
+    Process-pool worker: jammed count for a slice of terminals
+
+    須為模塊層級函數才能被 pickle；各終端互不相依，
+    整段結果以部分和回傳後由主行程加總。
+    """
+    P_rx_uav, _ = Channel.calculate_link_budget_batch(
+        tx_coords=uav_ecef,
+        rx_coords=gt_ecef,
+        tx_power_dbw=jam_power,
+        tx_gain_db=jam_gain,
+        rx_gain_db=gt_G_R,
+        frequency_hz=jam_freq
+    )
+    J_total_W = np.exp(P_rx_uav * LN10_DIV_10).sum(axis=0)
+    sinr = p_rx_sat_dbw - np.log(J_total_W + gt_N_W) * TEN_DIV_LN10
+    return int((sinr < sinr_threshold_db).sum())
+
+
+def _make_movement_kernel(center_lat, center_lon,
+                          lat_min, lat_max, lon_min, lon_max):
+    """
+    產生針對固定目標區域特化的移動核心
+    Build a movement kernel specialized for a fixed target region
+
+    目標中心與邊界在模擬期間不變，以閉包常數交給 numba 編譯，
+    LLVM 可將其折疊進指令流；每步只傳入會變的位置與步長。
+
+    :return: _move(pos_geo, move_distance) -> (flying (N,), fly_pos (N, 2))
+    """
+    @njit(fastmath=True)
+    def _move(pos_geo, move_distance):
+        N = pos_geo.shape[0]
+        flying = np.empty(N, dtype=np.bool_)
+        fly_pos = np.empty((N, 2))
+        for i in range(N):
+            lat = pos_geo[i, 0]
+            lon = pos_geo[i, 1]
+
+            dlat = center_lat - lat
+            dlon = center_lon - lon
+            dist = np.sqrt(dlat * dlat + dlon * dlon)
+
+            in_target = (lat_min <= lat <= lat_max and
+                         lon_min <= lon <= lon_max)
+            f = (not in_target) and dist > move_distance
+            flying[i] = f
+            if f:
+                fly_pos[i, 0] = lat + dlat / dist * move_distance
+                fly_pos[i, 1] = lon + dlon / dist * move_distance
+            else:
+                fly_pos[i, 0] = lat
+                fly_pos[i, 1] = lon
+        return flying, fly_pos
+
+    return _move
 
 
 class UAVSwarm:
@@ -25,7 +101,15 @@ class UAVSwarm:
         :param target_region: 目標區域 (lat_range, lon_range)，如果為 None 則自動計算
         """
         self.num_uavs = num_uavs
-        
+
+        # PCG64 產生器（固定種子以確保可重現性）與預分配的擾動緩衝，
+        # 取代每步配置新陣列的舊式全域 np.random.rand
+        # Seeded PCG64 generator plus a preallocated perturbation buffer,
+        # replacing per-step allocations from the legacy global RNG
+        self._rng = np.random.default_rng(42)
+        self._noise_buf = np.empty((num_uavs, 2))
+
+
         # 狀態：每架無人機的 (緯度, 經度) - 簡化優化空間
         lat_min, lat_max = initial_lat_range
         lon_min, lon_max = initial_lon_range
@@ -76,26 +160,58 @@ class UAVSwarm:
             
         else:  # 'random'
             # 隨機部署
-            np.random.seed(42)  # 固定種子以確保可重現性
-            self.uav_positions_geo = np.random.rand(num_uavs, 2) * [
+            self.uav_positions_geo = self._rng.random((num_uavs, 2)) * [
                 lat_max - lat_min, lon_max - lon_min
             ] + [lat_min, lon_min]
         
+        # 地理座標以行主序 (Fortran order) 存放：lat、lon 各自成為
+        # 連續的 SoA 欄位，update_formation 的欄位切片是單位步幅視圖；
+        # ECEF 保持列主序，核心以 (x, y, z) 列為單位讀取
+        # Geo coordinates are stored column-major so the lat/lon column
+        # slices are contiguous SoA arrays; ECEF stays row-major because
+        # the kernels read whole (x, y, z) rows
+        self.uav_positions_geo = np.asfortranarray(
+            self.uav_positions_geo, dtype=float)
+
         # 輔助：存儲無人機在 ECEF 座標下的位置
         self.uav_positions_ecef = self._geo_to_ecef(self.uav_positions_geo)
         
+        # FSPL 的頻率常數項 20log10(4πf/c)，干擾頻率固定故只算一次；
+        # 其他頻率（衛星）首次出現時計算並快取
+        self.fspl_const_db = 20 * math.log10(
+            4 * math.pi * UAV_FREQ / C_LIGHT)
+        self._fspl_const_by_freq = {UAV_FREQ: self.fspl_const_db}
+
+        # 地面終端屬性陣列快取（終端不移動，跨適應度評估重用）
+        self._gt_cache = None
+
+        # 大型適應度評估用的持久行程池（惰性建立，避免每次呼叫
+        # 重新 fork 的開銷）
+        self._executor = None
+
+        # 每個優化步評估的候選陣型數：多組擾動同場比較後取最佳，
+        # 以相同的解譯器開銷換取 K 倍的搜索量
+        # Candidate formations evaluated per optimization step
+        self.num_candidates = 4
+
+        # 針對固定目標區域特化的 JIT 移動核心（無 numba 時為 None，
+        # update_formation 改走向量化 NumPy 路徑）
+        self._movement_kernel = (_make_movement_kernel(
+            self.target_center_lat, self.target_center_lon,
+            self.target_lat_range[0], self.target_lat_range[1],
+            self.target_lon_range[0], self.target_lon_range[1])
+            if NUMBA_AVAILABLE else None)
+
         # 飛行速度（度/秒，約 200-300 km/h 的無人機）
         # 在 20km 高度，1 度緯度約 111 km，1 度經度約 111*cos(lat) km
         # 假設速度 250 km/h ≈ 0.069 km/s，約 0.0006 度/秒
         self.speed_deg_per_sec = 0.0006  # 約 250 km/h
     
     def _geo_to_ecef(self, geo_coords):
-        """將地理座標 (lat, lon) 轉換為 ECEF 座標 (x, y, z)"""
-        ecef_coords = []
-        for lat, lon in geo_coords:
-            coord = geo_to_ecef(lat, lon, UAV_ALTITUDE)
-            ecef_coords.append(coord)
-        return np.array(ecef_coords)
+        """將地理座標 (lat, lon) 批次轉換為 ECEF 座標 (x, y, z)"""
+        geo_coords = np.asarray(geo_coords)
+        return geo_to_ecef_batch(geo_coords[:, 0], geo_coords[:, 1],
+                                 UAV_ALTITUDE)
     
     def get_jammer_coord(self, uav_index):
         """返回特定無人機的 ECEF 座標"""
@@ -121,107 +237,208 @@ class UAVSwarm:
         # 計算移動距離（度）
         move_distance = self.speed_deg_per_sec * dt
         
-        new_geo_positions = self.uav_positions_geo.copy()
-        
-        for i in range(self.num_uavs):
-            current_lat, current_lon = self.uav_positions_geo[i]
-            
-            # 計算到目標中心的距離和方向
-            dlat = self.target_center_lat - current_lat
-            dlon = self.target_center_lon - current_lon
-            distance = np.sqrt(dlat**2 + dlon**2)
-            
+        if self._movement_kernel is not None:
+            # 特化的 JIT 核心：目標區域常數已折疊進編譯後的程式碼
+            flying, fly_positions = self._movement_kernel(
+                self.uav_positions_geo, move_distance)
+        else:
+            # 所有無人機的移動邏輯一次以陣列運算完成，不逐架進入
+            # Python 迴圈
+            # Movement logic for all UAVs in one array sweep instead of
+            # a per-UAV Python loop
+            lat = self.uav_positions_geo[:, 0]
+            lon = self.uav_positions_geo[:, 1]
+
+            # 到目標中心的向量與距離
+            d = np.array([self.target_center_lat,
+                          self.target_center_lon]) - self.uav_positions_geo
+            distance = np.sqrt((d * d).sum(axis=1))
+
             # 判斷是否已到達目標區域
-            in_target_lat = (self.target_lat_range[0] <= current_lat <= self.target_lat_range[1])
-            in_target_lon = (self.target_lon_range[0] <= current_lon <= self.target_lon_range[1])
-            in_target = in_target_lat and in_target_lon
-            
-            if not in_target and distance > move_distance:
-                # 尚未到達目標區域，繼續向目標飛行
-                # 計算方向向量
-                direction_lat = dlat / distance
-                direction_lon = dlon / distance
-                
-                # 移動
-                new_lat = current_lat + direction_lat * move_distance
-                new_lon = current_lon + direction_lon * move_distance
-                
-                new_geo_positions[i] = [new_lat, new_lon]
-            else:
-                # 已到達目標區域，進行優化調整
-                # 在目標區域內進行小幅優化移動
-                step_size = 0.05  # 度
-                test_lat = current_lat + (np.random.rand() - 0.5) * step_size
-                test_lon = current_lon + (np.random.rand() - 0.5) * step_size
-                
-                # 限制在目標區域內
-                test_lat = np.clip(test_lat, self.target_lat_range[0], self.target_lat_range[1])
-                test_lon = np.clip(test_lon, self.target_lon_range[0], self.target_lon_range[1])
-                
-                new_geo_positions[i] = [test_lat, test_lon]
-        
-        # 更新位置
-        self.uav_positions_geo = new_geo_positions
-        self.uav_positions_ecef = self._geo_to_ecef(self.uav_positions_geo)
-        
-        # 計算適應度
-        fitness = self._calculate_fitness(
-            ground_terminals, satellite_positions,
-            satellite_params, channel_module
-        )
-        
-        return fitness
+            in_target = ((self.target_lat_range[0] <= lat) &
+                         (lat <= self.target_lat_range[1]) &
+                         (self.target_lon_range[0] <= lon) &
+                         (lon <= self.target_lon_range[1]))
+            flying = ~in_target & (distance > move_distance)
+
+            # 尚未到達目標區域者：沿方向向量朝目標飛行
+            safe_distance = np.where(distance > 0.0, distance, 1.0)
+            fly_positions = (self.uav_positions_geo +
+                             d / safe_distance[:, None] * move_distance)
+
+        # 衛星訊號與無人機位置無關，整個候選評估只算一次
+        p_rx_sat = self._compute_sat_prx(ground_terminals,
+                                         satellite_positions,
+                                         satellite_params, channel_module)
+
+        # 評估 K 組候選陣型（飛行部分各候選相同，僅優化擾動不同），
+        # 取適應度最高者提交
+        # Evaluate K candidate formations and commit the best one
+        step_size = 0.05  # 優化擾動幅度（度）
+        current_geo = self.uav_positions_geo
+        current_ecef = self.uav_positions_ecef
+        best_fitness = -1
+        best_geo = current_geo
+        best_ecef = current_ecef
+
+        for _ in range(self.num_candidates):
+            # 擾動緩衝跨候選與跨步重用，random(out=...) 不重新配置
+            self._rng.random(out=self._noise_buf)
+            self._noise_buf -= 0.5
+            self._noise_buf *= step_size
+
+            # 已到達者：小幅優化擾動並限制在目標區域內
+            opt_positions = current_geo + self._noise_buf
+            np.clip(opt_positions[:, 0], self.target_lat_range[0],
+                    self.target_lat_range[1], out=opt_positions[:, 0])
+            np.clip(opt_positions[:, 1], self.target_lon_range[0],
+                    self.target_lon_range[1], out=opt_positions[:, 1])
+
+            cand_geo = np.where(flying[:, None],
+                                fly_positions, opt_positions)
+
+            # 只對實際移動的無人機重算 ECEF（增量更新），
+            # 靜止者的 ECEF 列保持不動
+            # Delta update: recompute ECEF only for UAVs that moved
+            moved = np.any(cand_geo != current_geo, axis=1)
+            cand_ecef = current_ecef.copy()
+            if moved.any():
+                cand_ecef[moved] = self._geo_to_ecef(cand_geo[moved])
+
+            self.uav_positions_ecef = cand_ecef
+            fitness = self._fitness_given_sat_prx(
+                p_rx_sat, ground_terminals, channel_module)
+
+            if fitness > best_fitness:
+                best_fitness = fitness
+                best_geo = cand_geo
+                best_ecef = cand_ecef
+
+        # 提交最佳候選（地理座標維持行主序的 SoA 佈局）
+        self.uav_positions_geo = np.asfortranarray(best_geo)
+        self.uav_positions_ecef = best_ecef
+
+        return best_fitness
     
+    def _fspl_const(self, frequency_hz):
+        """返回該頻率的 FSPL 常數項 20log10(4πf/c)，首次出現時計算並快取"""
+        const = self._fspl_const_by_freq.get(frequency_hz)
+        if const is None:
+            const = 20 * math.log10(
+                4 * math.pi * frequency_hz / C_LIGHT)
+            self._fspl_const_by_freq[frequency_hz] = const
+        return const
+
+    def _get_gt_arrays(self, ground_terminals):
+        """
+        取得（並快取）地面終端的堆疊屬性陣列
+        Get (and cache) the stacked ground-terminal attribute arrays
+
+        終端位置與增益在模擬期間不變，以列表身份為鍵快取，
+        讓連續的適應度評估免除重複的屬性收集。
+        """
+        cache = self._gt_cache
+        if cache is None or cache[0] is not ground_terminals:
+            gt_ecef = np.stack(
+                [gt.get_ecef_coord() for gt in ground_terminals])
+            gt_G_R = np.array([gt.G_R_dB for gt in ground_terminals],
+                              dtype=float)
+            gt_N_W = np.array([gt.N_W for gt in ground_terminals],
+                              dtype=float)
+            self._gt_cache = (ground_terminals, gt_ecef, gt_G_R, gt_N_W)
+        return self._gt_cache[1], self._gt_cache[2], self._gt_cache[3]
+
     def _calculate_fitness(self, ground_terminals, satellite_positions,
                            satellite_params, channel_module):
         """
-        計算適應度函數：被阻斷的地面終端數量
-        Calculate fitness: number of jammed terminals
+        計算適應度函數：被阻斷的地面終端數量（向量化）
+        Calculate fitness: number of jammed terminals (vectorized)
+
+        所有 (終端, 衛星) 與 (終端, 無人機) 配對的鏈路預算
+        以批次廣播一次算完，不再逐對呼叫。
+        """
+        P_rx = self._compute_sat_prx(ground_terminals, satellite_positions,
+                                     satellite_params, channel_module)
+        return self._fitness_given_sat_prx(P_rx, ground_terminals,
+                                           channel_module)
+
+    def _compute_sat_prx(self, ground_terminals, satellite_positions,
+                         satellite_params, channel_module):
+        """
+        計算每個終端收到的最強衛星訊號 P_rx (dBW)
+        Compute the strongest satellite P_rx per terminal
+
+        衛星位置在單一時間步內不變，呼叫端可以把結果在多次
+        無人機適應度評估之間重用。
         """
         tx_power_sat, tx_gain_sat, freq_sat = satellite_params
-        jammed_count = 0
-        
-        for gt in ground_terminals:
-            # a. 計算衛星訊號 P_rx (選擇最近的衛星)
-            P_rx_sat_list = []
-            for sat_pos in satellite_positions:
-                P_rx, _ = channel_module.calculate_link_budget(
-                    tx_coord=sat_pos,
-                    rx_coord=gt.get_ecef_coord(),
-                    tx_power_dbw=tx_power_sat,
-                    tx_gain_db=tx_gain_sat,
-                    rx_gain_db=gt.G_R_dB,
-                    frequency_hz=freq_sat
-                )
-                P_rx_sat_list.append(P_rx)
-            
-            P_rx = max(P_rx_sat_list)  # 假設終端鎖定最強的衛星訊號
-            
-            # b. 計算總干擾 J_total
-            J_total_W = 0.0
-            jam_power, jam_gain, jam_freq = self.get_jammer_params()
-            
-            for uav_coord in self.uav_positions_ecef:
-                P_rx_uav, _ = channel_module.calculate_link_budget(
-                    tx_coord=uav_coord,
-                    rx_coord=gt.get_ecef_coord(),
-                    tx_power_dbw=jam_power,
-                    tx_gain_db=jam_gain,
-                    rx_gain_db=gt.G_R_dB,
-                    frequency_hz=jam_freq
-                )
-                # 轉換為 W 後累加
-                J_total_W += 10**(P_rx_uav / 10)
-            
-            # c. 計算 SINR
-            if J_total_W > 0:
-                J_total_dbw = 10 * np.log10(J_total_W)
-            else:
-                J_total_dbw = -float('inf')
-            sinr = gt.calculate_sinr(P_rx, J_total_dbw)
-            
-            if gt.is_jammed(sinr):
-                jammed_count += 1
-        
-        return jammed_count
+        gt_ecef, gt_G_R, _ = self._get_gt_arrays(ground_terminals)
+
+        P_rx_sat, _ = channel_module.calculate_link_budget_batch(
+            tx_coords=np.stack(satellite_positions),
+            rx_coords=gt_ecef,
+            tx_power_dbw=tx_power_sat,
+            tx_gain_db=tx_gain_sat,
+            rx_gain_db=gt_G_R,
+            frequency_hz=freq_sat,
+            fspl_const_db=self._fspl_const(freq_sat)
+        )
+        return P_rx_sat.max(axis=0)  # 終端鎖定最強的衛星訊號
+
+    def _fitness_given_sat_prx(self, P_rx_sat_per_gt, ground_terminals,
+                               channel_module):
+        """
+        在已知衛星 P_rx 的前提下計算干擾適應度
+        Compute the jamming fitness given precomputed satellite P_rx
+
+        只評估隨無人機位置變化的部分：干擾功率疊加與 SINR。
+        有 numba 時改走融合的 count_jammed 核心，無中間 (U, G) 矩陣。
+        """
+        gt_ecef, gt_G_R, gt_N_W = self._get_gt_arrays(ground_terminals)
+        jam_power, jam_gain, jam_freq = self.get_jammer_params()
+
+        if NUMBA_AVAILABLE:
+            return int(count_jammed(
+                gt_ecef, gt_G_R,
+                np.asarray(P_rx_sat_per_gt, dtype=float), gt_N_W,
+                self.uav_positions_ecef, jam_power + jam_gain,
+                jam_freq, SINR_THRESHOLD_DB))
+
+        # 無 numba 且問題夠大時，將終端切塊分給行程池並加總部分和；
+        # 終端之間互不相依，可安全平行
+        if len(ground_terminals) * self.num_uavs > _PARALLEL_THRESHOLD:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=os.cpu_count())
+            n_workers = os.cpu_count() or 1
+            chunk = -(-len(gt_ecef) // n_workers)  # ceil division
+            p_rx_sat = np.asarray(P_rx_sat_per_gt, dtype=float)
+            futures = [
+                self._executor.submit(
+                    _fitness_worker,
+                    gt_ecef[s:s + chunk], gt_G_R[s:s + chunk],
+                    gt_N_W[s:s + chunk], p_rx_sat[s:s + chunk],
+                    self.uav_positions_ecef, jam_power, jam_gain,
+                    jam_freq, SINR_THRESHOLD_DB)
+                for s in range(0, len(gt_ecef), chunk)
+            ]
+            return sum(f.result() for f in futures)
+
+        # 計算總干擾 J_total (線性疊加所有無人機)
+        P_rx_uav, _ = channel_module.calculate_link_budget_batch(
+            tx_coords=self.uav_positions_ecef,
+            rx_coords=gt_ecef,
+            tx_power_dbw=jam_power,
+            tx_gain_db=jam_gain,
+            rx_gain_db=gt_G_R,
+            frequency_hz=jam_freq,
+            fspl_const_db=self.fspl_const_db
+        )
+        # dB→W 以 exp 取代 pow：10**(x/10) == exp(x·ln10/10)
+        J_total_W = np.exp(P_rx_uav * LN10_DIV_10).sum(axis=0)
+
+        # 計算 SINR 並統計被阻斷的終端
+        sinr = (P_rx_sat_per_gt -
+                np.log(J_total_W + gt_N_W) * TEN_DIV_LN10)
+        return int((sinr < SINR_THRESHOLD_DB).sum())
 
@@ -2,30 +2,70 @@
 工具函數：座標轉換和輔助計算
 Utility functions: coordinate conversion and helper calculations
 """
+import functools
+import math
+
 import numpy as np
-from constants import EARTH_RADIUS, UAV_ALTITUDE
+from constants import EARTH_RADIUS, UAV_ALTITUDE, K_BOLTZMANN
+
+
+@functools.lru_cache(maxsize=None)
+def _geo_to_ecef_cached(latitude, longitude, altitude):
+    """
+    geo_to_ecef 的快取內核，返回不可變的 tuple 以便安全快取
+
+    標量路徑使用 math 模塊的三角函數：對單一數值比 NumPy ufunc
+    省去一次分派開銷；陣列輸入請走 geo_to_ecef_batch。
+    """
+    lat_rad = math.radians(latitude)
+    lon_rad = math.radians(longitude)
+
+    R = EARTH_RADIUS + altitude
+    cos_lat = math.cos(lat_rad)
+
+    x = R * cos_lat * math.cos(lon_rad)
+    y = R * cos_lat * math.sin(lon_rad)
+    z = R * math.sin(lat_rad)
+
+    return (x, y, z)
 
 
 def geo_to_ecef(latitude, longitude, altitude=0.0):
     """
     將地理座標 (緯度, 經度, 高度) 轉換為 ECEF 座標 (x, y, z)
     Convert geographic coordinates to ECEF coordinates
-    
+
+    相同座標的重複轉換直接命中快取，不再重算三角函數。
+
     :param latitude: 緯度 (度)
     :param longitude: 經度 (度)
     :param altitude: 高度 (米)
     :return: ECEF 座標 (x, y, z) in meters
     """
-    lat_rad = np.deg2rad(latitude)
-    lon_rad = np.deg2rad(longitude)
-    
+    return np.array(_geo_to_ecef_cached(latitude, longitude, altitude))
+
+
+def geo_to_ecef_batch(lat_arr, lon_arr, altitude=0.0):
+    """
+    批次將地理座標陣列轉換為 ECEF 座標矩陣
+    Convert arrays of geographic coordinates to an ECEF matrix
+
+    對整個陣列只呼叫一次三角函數 ufunc，取代逐點的 Python 迴圈。
+
+    :param lat_arr: 緯度陣列 (度)
+    :param lon_arr: 經度陣列 (度)
+    :param altitude: 高度 (米)，標量或陣列
+    :return: ECEF 座標 (N, 3) ndarray in meters
+    """
+    lat_rad = np.deg2rad(np.asarray(lat_arr, dtype=float))
+    lon_rad = np.deg2rad(np.asarray(lon_arr, dtype=float))
+
     R = EARTH_RADIUS + altitude
-    
-    x = R * np.cos(lat_rad) * np.cos(lon_rad)
-    y = R * np.cos(lat_rad) * np.sin(lon_rad)
-    z = R * np.sin(lat_rad)
-    
-    return np.array([x, y, z])
+    cos_lat = np.cos(lat_rad)
+
+    return np.stack([R * cos_lat * np.cos(lon_rad),
+                     R * cos_lat * np.sin(lon_rad),
+                     R * np.sin(lat_rad)], axis=1)
 
 
 def ecef_to_geo(x, y, z):
@@ -45,18 +85,26 @@ def ecef_to_geo(x, y, z):
     return latitude, longitude, altitude
 
 
+@functools.lru_cache(maxsize=32)
+def _noise_power_dbw_cached(T_q, B_q):
+    """calculate_noise_power_dbw 的快取內核（鍵已量化）"""
+    noise_power_W = K_BOLTZMANN * T_q * B_q
+    noise_power_dBW = 10 * np.log10(noise_power_W) if noise_power_W > 0 else -float('inf')
+    return noise_power_dBW
+
+
 def calculate_noise_power_dbw(T_sys, B):
     """
     計算系統熱噪聲功率 N (單位：dBW)
     Calculate thermal noise power
-    
+
+    多數終端共用相同 (T_sys, B)，以 lru_cache 記憶重複查詢；
+    浮點鍵先量化（溫度取 3 位小數、頻寬取整）以免近乎相同的
+    參數各占一個快取項。
+
     :param T_sys: 系統噪聲溫度 (K)
     :param B: 頻寬 (Hz)
     :return: 噪聲功率 (dBW)
     """
-    from constants import K_BOLTZMANN
-    
-    noise_power_W = K_BOLTZMANN * T_sys * B
-    noise_power_dBW = 10 * np.log10(noise_power_W) if noise_power_W > 0 else -float('inf')
-    return noise_power_dBW
+    return _noise_power_dbw_cached(round(T_sys, 3), round(B, 0))
 
@@ -2,17 +2,271 @@
 視覺化模塊：3D 空間、2D 地圖和時間序列圖表
 Visualization module: 3D space, 2D map, and time series plots
 """
+import hashlib
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation, PillowWriter
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d import Axes3D
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 from constants import EARTH_RADIUS
 
+# imageio 為可選依賴：可用時逐幀串流寫出 GIF，記憶體占用與幀數無關；
+# 缺少時退回 PillowWriter（整段幀緩衝經 Pillow 寫出）
+# imageio is optional: stream frames to disk at constant memory when
+# available, otherwise fall back to the buffering PillowWriter path
+try:
+    import imageio.v3 as iio
+    IMAGEIO_AVAILABLE = True
+except ImportError:
+    iio = None
+    IMAGEIO_AVAILABLE = False
+
 # 配置中文字體支持
 # Configure Chinese font support
 plt.rcParams['font.sans-serif'] = ['PingFang HK', 'STHeiti', 'Arial Unicode MS', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False  # 解決負號顯示問題
 
+# 地球表面網格在模塊載入時計算一次，所有 3D 圖共用；
+# 逐次呼叫重算 30×30 的三角函數與外積毫無必要
+# Earth-sphere mesh computed once at import and shared by all 3D plots
+_U, _V = np.meshgrid(np.linspace(0, 2 * np.pi, 30),
+                     np.linspace(0, np.pi, 30), indexing='ij')
+_EARTH_X = EARTH_RADIUS * np.cos(_U) * np.sin(_V)
+_EARTH_Y = EARTH_RADIUS * np.sin(_U) * np.sin(_V)
+_EARTH_Z = EARTH_RADIUS * np.cos(_V)
+
+# SINR 顏色查找表：色圖在模塊載入時取樣一次，之後以整數索引取色，
+# 不再對每個點各呼叫一次 cmap(norm(...))
+# SINR color lookup table sampled once at import; points are colored by
+# integer indexing instead of per-point cmap(norm(...)) calls
+_SINR_CMAP = plt.cm.RdYlGn_r  # 紅色代表低 SINR (被阻斷), 綠色代表高 SINR
+_SINR_LUT = _SINR_CMAP(np.linspace(0, 1, 1024))
+
+
+def _sinr_colors(sinr_arr, vmin, vmax):
+    """以查找表將 SINR 陣列批次映射為 RGBA 顏色 (N, 4)"""
+    span = vmax - vmin
+    if span <= 0:
+        return _SINR_LUT[np.zeros(len(sinr_arr), dtype=np.int32)]
+    t = np.clip((sinr_arr - vmin) / span, 0.0, 1.0)
+    return _SINR_LUT[(t * 1023).astype(np.int32)]
+
+
+def _uav_gt_segments(uav_pos, gt_pos):
+    """
+    以廣播組裝所有 (無人機, 終端) 配對的干擾鏈路線段張量
+    Build the interference-link segment tensor for all (UAV, terminal)
+    pairs via broadcasting
+
+    靜態 3D 圖與 3D 動畫共用；無 Python 迴圈，單次配置輸出陣列，
+    float32 以配合繪圖路徑。
+
+    :param uav_pos: 無人機位置 (U, 3)
+    :param gt_pos: 地面終端位置 (G, 3)
+    :return: (U*G, 2, 3) float32 線段張量，供 Line3DCollection 使用
+    """
+    uav_pos = np.asarray(uav_pos, dtype=np.float32)
+    gt_pos = np.asarray(gt_pos, dtype=np.float32)
+    u, g = len(uav_pos), len(gt_pos)
+    segments = np.empty((u * g, 2, 3), dtype=np.float32)
+    segments[:, 0, :] = np.broadcast_to(
+        uav_pos[:, None, :], (u, g, 3)).reshape(-1, 3)
+    segments[:, 1, :] = np.broadcast_to(
+        gt_pos[None, :, :], (u, g, 3)).reshape(-1, 3)
+    return segments
+
+
+# 已渲染動畫的磁碟快取目錄：開發循環常以相同 results 重複呼叫
+# animate_*，每次重渲染數百幀；以內容雜湊為鍵可把重跑變成檔案複製
+# Disk cache for rendered animations, keyed by content hash: reruns on
+# identical results become a file copy instead of re-rendering
+_VIZ_CACHE_DIR = '.viz_cache'
+
+
+def _animation_cache_key(*parts):
+    """
+    由動畫的輸入內容計算快取鍵
+    Compute a cache key from the animation's input content
+
+    :param parts: ndarray 以位元組參與雜湊，其餘以字串表示參與
+    :return: 16 字元十六進位鍵
+    """
+    h = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update(np.ascontiguousarray(part).tobytes())
+        else:
+            h.update(str(part).encode())
+    return h.hexdigest()
+
+
+def _fetch_cached_gif(key, save_path):
+    """快取命中時把已渲染的 GIF 複製到 save_path，返回是否命中"""
+    cached = os.path.join(_VIZ_CACHE_DIR, key + '.gif')
+    if os.path.exists(cached):
+        shutil.copy(cached, save_path)
+        print(f"    ✓ 命中動畫快取，已複製到 {save_path}")
+        return True
+    return False
+
+
+def _store_cached_gif(key, save_path):
+    """將剛渲染完成的 GIF 存入快取目錄"""
+    os.makedirs(_VIZ_CACHE_DIR, exist_ok=True)
+    shutil.copy(save_path, os.path.join(_VIZ_CACHE_DIR, key + '.gif'))
+
+
+def _results_to_soa(results):
+    """
+    將逐幀字典列表形式的結果一次性轉為連續的 Struct-of-Arrays
+    Convert the per-frame list-of-dicts results to contiguous
+    Struct-of-Arrays form once
+
+    動畫的每個 animate 回呼原本都要對 gt_results 做一次字典列表
+    推導；先整批轉成 (幀數, 終端數) 的 ndarray 後，回呼內只剩
+    切片索引。
+    Each animate callback previously re-extracted Python lists from
+    dicts per frame; after one bulk conversion the callbacks do only
+    slab indexing.
+
+    :param results: 模擬結果列表
+    :return: dict，含 'sinr' (F, G)、'jammed' (F, G) bool、
+        'sat_pos' (F, S, 3)、'uav_pos' (F, N, 3)、'time' (F,)、
+        'avg_sinr' (F,)、'jammed_rate' (F,) 各 ndarray
+    """
+    n = len(results)
+    # 繪圖陣列以 float32 儲存：Agg 後端內部本就以單精度光柵化，
+    # float64 只是白白加倍記憶體流量
+    # Plotting arrays in float32: the Agg backend rasterizes in single
+    # precision anyway, float64 would just double memory traffic
+    return {
+        'sinr': np.asarray([[r['sinr'] for r in res['gt_results']]
+                            for res in results], dtype=np.float32),
+        'jammed': np.asarray([[r['is_jammed'] for r in res['gt_results']]
+                              for res in results], dtype=bool),
+        'sat_pos': np.stack([np.asarray(res['satellite_positions'],
+                                        dtype=np.float32)
+                             for res in results]),
+        'uav_pos': np.stack([np.asarray(res['uav_positions'],
+                                        dtype=np.float32)
+                             for res in results]),
+        'time': np.fromiter((res['time'] for res in results),
+                            dtype=float, count=n),
+        'avg_sinr': np.fromiter((res['avg_sinr'] for res in results),
+                                dtype=float, count=n),
+        'jammed_rate': np.fromiter((res['jammed_rate'] for res in results),
+                                   dtype=float, count=n),
+    }
+
+
+def _render_2d_frame(state):
+    """
+    行程池工作函數：以獨立 Figure 渲染單一 2D 性能幀為 RGB 陣列
+    Process-pool worker: render one 2D performance frame to RGB
+
+    須為模塊層級函數才能被 pickle；每個行程自建 Figure（非
+    pyplot.figure，避免共享的 pyplot 全域狀態），只接收小型的
+    每幀數據元組，不傳遞 matplotlib artist。
+    """
+    (gt_lon, gt_lat, sinr_arr, time_s, avg_sinr, jammed_rate,
+     vmin, vmax, title) = state
+
+    fig = Figure(figsize=(10, 8))
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.set_xlabel("經度 (Longitude)", fontsize=11)
+    ax.set_ylabel("緯度 (Latitude)", fontsize=11)
+    ax.grid(True, alpha=0.3)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+
+    colors = _sinr_colors(sinr_arr, vmin, vmax)
+    jammed = sinr_arr < -5.0
+    ax.scatter(gt_lon[~jammed], gt_lat[~jammed], c=colors[~jammed],
+               s=100, marker='o', edgecolors='black', linewidths=1)
+    ax.scatter(gt_lon[jammed], gt_lat[jammed], c=colors[jammed],
+               s=200, marker='X', edgecolors='black', linewidths=1)
+
+    sm = plt.cm.ScalarMappable(cmap=_SINR_CMAP,
+                               norm=plt.Normalize(vmin=vmin, vmax=vmax))
+    sm.set_array([])
+    fig.colorbar(sm, ax=ax, label="SINR (dB)")
+
+    ax.text(0.02, 0.98,
+            f'時間: {time_s:.0f} s\n'
+            f'平均 SINR: {avg_sinr:.2f} dB\n'
+            f'阻斷率: {jammed_rate*100:.1f}%',
+            transform=ax.transAxes, fontsize=12, verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba())[:, :, :3].copy()
+
+
+def _save_animation(fig, animate, frame_indices, save_path, interval,
+                    frame_digest=None):
+    """
+    將動畫保存為 GIF，優先以 imageio 逐幀串流寫出
+    Save an animation as GIF, streaming frame by frame via imageio
+
+    逐幀 render → 寫出 → 丟棄，不在記憶體中保留整段幀序列；
+    imageio 不可用時才建立 FuncAnimation，退回 anim.save 的
+    PillowWriter 路徑。FuncAnimation 只能在後備路徑建立：掛在同一
+    figure 上的動畫會在首次 draw 事件把回傳的 artist 標記為
+    animated，之後的完整重繪一律略過它們，串流寫出的每一幀
+    都會相同。
+    The FuncAnimation must only exist on the fallback path: a live
+    animation attached to the same figure marks the returned artists
+    animated on its first draw event, after which full redraws skip
+    them and every streamed frame comes out identical.
+
+    :param fig: 圖形物件
+    :param animate: 幀更新函數
+    :param frame_indices: 要輸出的幀索引序列
+    :param save_path: 保存路徑
+    :param interval: 幀間隔（毫秒）
+    :param frame_digest: 可選的幀內容摘要函數 frame_digest(i)；
+        連續相同摘要的幀直接重寫上一張已渲染影像，跳過渲染。
+        摘要必須涵蓋該幀「所有」會被渲染的輸入（含時間文字框），
+        否則跳過的幀會帶著過期的畫面內容；完全相同的重複幀在
+        GIF 中的壓縮成本趨近於零
+    :return: 後備路徑的 FuncAnimation 物件；imageio 串流路徑為 None
+    """
+    print(f"    正在保存動畫到 {save_path}...")
+    if IMAGEIO_AVAILABLE:
+        prev_digest = None
+        prev_image = None
+        with iio.imopen(save_path, 'w', extension='.gif') as out:
+            for i in frame_indices:
+                digest = frame_digest(i) if frame_digest else None
+                if digest is not None and digest == prev_digest:
+                    out.write(prev_image)
+                    continue
+                animate(i)
+                fig.canvas.draw()
+                buf = np.asarray(fig.canvas.buffer_rgba())
+                if frame_digest is None:
+                    out.write(buf[:, :, :3])
+                else:
+                    # 保留一份以便下個重複幀直接重寫
+                    prev_image = buf[:, :, :3].copy()
+                    prev_digest = digest
+                    out.write(prev_image)
+        print(f"    ✓ 動畫已保存")
+        return None
+
+    anim = FuncAnimation(fig, animate, frames=frame_indices,
+                         interval=interval, blit=False, repeat=True,
+                         cache_frame_data=False)
+    anim.save(save_path, writer=PillowWriter(fps=1000 // interval))
+    print(f"    ✓ 動畫已保存")
+    return anim
+
 
 def visualize_3d_simulation(sat_positions, uav_positions, gt_positions, 
                             gt_status, title="無人機蜂群對 LEO 衛星的干擾空間示意圖"):
@@ -35,21 +289,21 @@ def visualize_3d_simulation(sat_positions, uav_positions, gt_positions,
     ax.set_ylabel("Y (m)", fontsize=10)
     ax.set_zlabel("Z (m)", fontsize=10)
     
-    # 轉換為 numpy 數組
+    # 轉換為 numpy 數組（float32 即可，Agg 光柵化本就是單精度）
     if len(sat_positions) > 0:
-        sat_pos = np.array(sat_positions)
+        sat_pos = np.asarray(sat_positions, dtype=np.float32)
     else:
-        sat_pos = np.array([]).reshape(0, 3)
-    
+        sat_pos = np.empty((0, 3), dtype=np.float32)
+
     if len(uav_positions) > 0:
-        uav_pos = np.array(uav_positions)
+        uav_pos = np.asarray(uav_positions, dtype=np.float32)
     else:
-        uav_pos = np.array([]).reshape(0, 3)
-    
+        uav_pos = np.empty((0, 3), dtype=np.float32)
+
     if len(gt_positions) > 0:
-        gt_pos = np.array(gt_positions)
+        gt_pos = np.asarray(gt_positions, dtype=np.float32)
     else:
-        gt_pos = np.array([]).reshape(0, 3)
+        gt_pos = np.empty((0, 3), dtype=np.float32)
     
     # 設置合理的軸範圍
     all_coords = []
@@ -67,13 +321,8 @@ def visualize_3d_simulation(sat_positions, uav_positions, gt_positions,
         ax.set_ylim([-max_coord, max_coord])
         ax.set_zlim([-max_coord, max_coord])
     
-    # A. 繪製地球表面 (簡化為一個球體的一部分)
-    u = np.linspace(0, 2 * np.pi, 30)
-    v = np.linspace(0, np.pi, 30)
-    x_earth = EARTH_RADIUS * np.outer(np.cos(u), np.sin(v))
-    y_earth = EARTH_RADIUS * np.outer(np.sin(u), np.sin(v))
-    z_earth = EARTH_RADIUS * np.outer(np.ones(np.size(u)), np.cos(v))
-    ax.plot_surface(x_earth, y_earth, z_earth, color='lightblue', 
+    # A. 繪製地球表面 (簡化為一個球體的一部分，網格為模塊常數)
+    ax.plot_surface(_EARTH_X, _EARTH_Y, _EARTH_Z, color='lightblue',
                    alpha=0.1, label='地球表面')
     
     # B. 繪製衛星
@@ -90,23 +339,30 @@ def visualize_3d_simulation(sat_positions, uav_positions, gt_positions,
     
     # D. 繪製地面終端及干擾鏈路
     if len(gt_pos) > 0:
-        for i in range(len(gt_pos)):
-            color = 'red' if gt_status[i] else 'green'
-            marker = 'X' if gt_status[i] else 'o'
-            label_text = '地面終端 (被阻斷)' if (i == 0 and gt_status[i]) else \
-                        ('地面終端 (正常)' if (i == 0 and not gt_status[i]) else "")
-            
-            ax.scatter(gt_pos[i, 0], gt_pos[i, 1], gt_pos[i, 2], 
-                      c=color, marker=marker, s=200, linewidths=2, 
-                      label=label_text, edgecolors='black')
-            
-            # 繪製干擾鏈路 (從每個無人機到這個地面終端)
-            if len(uav_pos) > 0:
-                for uav in uav_pos:
-                    ax.plot([uav[0], gt_pos[i, 0]], 
-                           [uav[1], gt_pos[i, 1]], 
-                           [uav[2], gt_pos[i, 2]], 
-                           color='red', linestyle='--', alpha=0.2, linewidth=1)
+        # 依阻斷狀態分成兩個批次 scatter（單次呼叫只支援單一
+        # marker），各帶一個圖例項；取代逐終端的散點呼叫與
+        # 逐點的標籤三元式
+        # Two masked batch scatters (one per status) with one legend
+        # entry each, instead of one scatter call per terminal
+        mask = np.asarray(gt_status, dtype=bool)
+        if mask.any():
+            ax.scatter(gt_pos[mask, 0], gt_pos[mask, 1], gt_pos[mask, 2],
+                      c='red', marker='X', s=200, linewidths=2,
+                      label='地面終端 (被阻斷)', edgecolors='black')
+        if (~mask).any():
+            ax.scatter(gt_pos[~mask, 0], gt_pos[~mask, 1], gt_pos[~mask, 2],
+                      c='green', marker='o', s=200, linewidths=2,
+                      label='地面終端 (正常)', edgecolors='black')
+
+        # 繪製干擾鏈路：所有 (無人機, 終端) 配對合成單一
+        # Line3DCollection，一個 artist 一次繪製，取代 O(N·M) 條
+        # 個別 Line3D
+        # All interference links as one Line3DCollection instead of
+        # O(N*M) individual Line3D artists
+        if len(uav_pos) > 0:
+            ax.add_collection3d(Line3DCollection(
+                _uav_gt_segments(uav_pos, gt_pos), colors='red',
+                linestyles='--', alpha=0.2, linewidths=1))
     
     # 設置視角
     ax.view_init(elev=30, azim=45)
@@ -116,59 +372,78 @@ def visualize_3d_simulation(sat_positions, uav_positions, gt_positions,
     return fig
 
 
-def visualize_2d_performance(gt_lon, gt_lat, sinr_values, 
-                            title="地面終端 SINR 性能分佈"):
+def visualize_2d_performance(gt_lon, gt_lat, sinr_values,
+                            title="地面終端 SINR 性能分佈", fig=None):
     """
     繪製 SINR 結果在地圖上的分佈圖
     Draw SINR distribution on map
-    
+
     :param gt_lon: 地面終端經度列表
     :param gt_lat: 地面終端緯度列表
     :param sinr_values: SINR 值列表
     :param title: 圖表標題
+    :param fig: 可重用的 Figure；參數掃描等長迴圈把前次返回的
+        figure 傳回來即可清空重畫，不再每次新建並累積在
+        pyplot 註冊表中
     """
-    fig, ax = plt.subplots(figsize=(10, 8))
+    if fig is None:
+        fig, ax = plt.subplots(figsize=(10, 8))
+    else:
+        # 清空整個 figure（連同前次的 colorbar 軸）後重建主軸
+        fig.clear()
+        ax = fig.add_subplot(111)
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.set_xlabel("經度 (Longitude)", fontsize=11)
     ax.set_ylabel("緯度 (Latitude)", fontsize=11)
     
-    # 設置 SINR 顏色映射
-    sinr_array = np.array(sinr_values)
+    # 設置 SINR 顏色映射（查找表批次取色；float32 足夠繪圖精度）
+    sinr_array = np.asarray(sinr_values, dtype=np.float32)
+    gt_lon = np.asarray(gt_lon, dtype=np.float32)
+    gt_lat = np.asarray(gt_lat, dtype=np.float32)
     vmin, vmax = np.min(sinr_array), np.max(sinr_array)
     norm = plt.Normalize(vmin=vmin, vmax=vmax)
-    cmap = plt.cm.RdYlGn_r  # 紅色代表低 SINR (被阻斷), 綠色代表高 SINR (良好)
-    
-    # 繪製每個終端
-    for lon, lat, sinr in zip(gt_lon, gt_lat, sinr_values):
-        color = cmap(norm(sinr))
-        marker_style = 'X' if sinr < -5.0 else 'o'  # 低於 -5 dB 則用 X 標記為阻斷
-        size = 200 if sinr < -5.0 else 100
-        ax.scatter(lon, lat, c=[color], s=size, marker=marker_style, 
-                   edgecolors='black', linewidths=1)
-    
+    colors = _sinr_colors(sinr_array, vmin, vmax)
+
+    # 正常與被阻斷終端各一個 scatter（matplotlib 單次呼叫只支援
+    # 單一 marker），取代逐終端的散點呼叫
+    # Two batched scatters (one marker each) instead of one per terminal
+    jammed = sinr_array < -5.0  # 低於 -5 dB 則用 X 標記為阻斷
+    ax.scatter(gt_lon[~jammed], gt_lat[~jammed], c=colors[~jammed],
+               s=100, marker='o', edgecolors='black', linewidths=1)
+    ax.scatter(gt_lon[jammed], gt_lat[jammed], c=colors[jammed],
+               s=200, marker='X', edgecolors='black', linewidths=1)
+
     # 添加顏色條
-    sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
+    sm = plt.cm.ScalarMappable(cmap=_SINR_CMAP, norm=norm)
     sm.set_array([])
-    cbar = plt.colorbar(sm, ax=ax, label="SINR (dB)")
+    cbar = fig.colorbar(sm, ax=ax, label="SINR (dB)")
     cbar.ax.tick_params(labelsize=9)
-    
+
     ax.grid(True, alpha=0.3)
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
-def visualize_time_series(time_steps, avg_sinr, jammed_rate, 
-                          title="蜂群干擾效果隨時間變化"):
+def visualize_time_series(time_steps, avg_sinr, jammed_rate,
+                          title="蜂群干擾效果隨時間變化", fig=None):
     """
     繪製平均 SINR 和阻斷率隨時間的變化圖
     Draw time series of average SINR and jammed rate
-    
+
     :param time_steps: 時間步長列表 (秒)
     :param avg_sinr: 平均 SINR 列表 (dB)
     :param jammed_rate: 阻斷率列表 (0-1)
     :param title: 圖表標題
+    :param fig: 可重用的 Figure；參數掃描等長迴圈把前次返回的
+        figure 傳回來即可清空重畫，不再每次新建並累積在
+        pyplot 註冊表中
     """
-    fig, ax1 = plt.subplots(figsize=(12, 6))
+    if fig is None:
+        fig, ax1 = plt.subplots(figsize=(12, 6))
+    else:
+        # 清空整個 figure（連同前次的 twinx 軸）後重建主軸
+        fig.clear()
+        ax1 = fig.add_subplot(111)
     ax1.set_title(title, fontsize=14, fontweight='bold')
     
     color = 'tab:blue'
@@ -204,7 +479,8 @@ def visualize_time_series(time_steps, avg_sinr, jammed_rate,
 
 def animate_3d_simulation(results, ground_terminals, 
                           title="無人機蜂群對 LEO 衛星的干擾空間動畫",
-                          interval=200, save_path='simulation_3d_animation.gif'):
+                          interval=200, save_path='simulation_3d_animation.gif',
+                          max_frames=200):
     """
     生成 3D 空間動畫，顯示整個模擬過程
     Generate 3D spatial animation showing the entire simulation process
@@ -214,228 +490,302 @@ def animate_3d_simulation(results, ground_terminals,
     :param title: 動畫標題
     :param interval: 動畫幀間隔（毫秒）
     :param save_path: 保存路徑
-    :return: 動畫對象
+    :param max_frames: 輸出動畫的幀數上限，超過時等距抽幀
+    :return: PillowWriter 後備路徑的動畫對象；imageio 串流或
+        快取命中時為 None（GIF 已寫出）
     """
-    # 計算所有時間步的座標範圍
-    all_positions = []
-    for result in results:
-        all_positions.extend(result['satellite_positions'])
-        all_positions.extend(result['uav_positions'].tolist())
-        all_positions.extend([gt.get_ecef_coord() for gt in ground_terminals])
-    
-    if len(all_positions) == 0:
+    if not results:
         return None
-    
-    all_positions = np.array(all_positions)
-    max_coord = np.max(np.abs(all_positions)) * 1.1
-    
-    # 創建圖形和軸
-    fig = plt.figure(figsize=(14, 12))
+
+    # 地面終端不移動，ECEF 座標在動畫開始前收集一次並逐幀重用
+    # Ground terminals are static; gather their ECEF coordinates once
+    gt_ecef = (np.stack([gt.get_ecef_coord() for gt in ground_terminals])
+               .astype(np.float32)
+               if ground_terminals else np.empty((0, 3), dtype=np.float32))
+
+    # 整批結果一次轉為 SoA 陣列，animate 回呼內只剩切片索引
+    # Convert results to SoA once; callbacks do slab indexing only
+    soa = _results_to_soa(results)
+
+    # 計算所有時間步的座標範圍：對各位置張量以 min/max 歸約遞推
+    # 絕對值上界，不串接整批位置、也不建立同尺寸的 abs 暫存
+    # Axis bounds from running min/max reductions per tensor, without
+    # concatenating all positions or materializing an abs() temporary
+    max_abs = 0.0
+    for arr in (gt_ecef, soa['sat_pos'], soa['uav_pos']):
+        if arr.size:
+            max_abs = max(max_abs, float(arr.max()), float(-arr.min()))
+    if max_abs == 0.0:
+        return None
+
+    max_coord = max_abs * 1.1
+
+    # 創建圖形和軸：直接用 Agg 後端的裸 Figure，不經 pyplot；
+    # pyplot 管理的圖在 save() 期間會觸發互動後端，約慢一倍，
+    # 也不會留在 pyplot 註冊表中洩漏
+    # Bare Agg Figure instead of pyplot: pyplot-managed figures invoke
+    # the interactive backend during save() and leak via the registry
+    fig = Figure(figsize=(14, 12))
+    FigureCanvasAgg(fig)
     ax = fig.add_subplot(111, projection='3d')
     ax.set_xlim([-max_coord, max_coord])
     ax.set_ylim([-max_coord, max_coord])
     ax.set_zlim([-max_coord, max_coord])
+    # 範圍已固定，關閉自動縮放：資料範圍一變動 blit 就失效、
+    # 整圖重繪，這裡的範圍本就涵蓋整場模擬
+    # Limits are fixed for the whole run; any data-limit change would
+    # defeat blitting and force a full redraw
+    ax.set_autoscale_on(False)
     ax.set_xlabel("X (m)", fontsize=10)
     ax.set_ylabel("Y (m)", fontsize=10)
     ax.set_zlabel("Z (m)", fontsize=10)
     
-    # 繪製地球表面（只繪製一次）
-    u = np.linspace(0, 2 * np.pi, 30)
-    v = np.linspace(0, np.pi, 30)
-    x_earth = EARTH_RADIUS * np.outer(np.cos(u), np.sin(v))
-    y_earth = EARTH_RADIUS * np.outer(np.sin(u), np.sin(v))
-    z_earth = EARTH_RADIUS * np.outer(np.ones(np.size(u)), np.cos(v))
-    ax.plot_surface(x_earth, y_earth, z_earth, color='lightblue', alpha=0.1)
-    
-    # 初始化繪圖對象
-    sat_scatter = None
-    uav_scatter = None
-    gt_scatters = []
-    gt_lines = []
-    time_text = ax.text2D(0.02, 0.98, '', transform=ax.transAxes, 
+    # 繪製地球表面：動畫路徑改用粗網格線框（12×12，單一線集合），
+    # plot_surface 的 ~900 個面片即使靜止也會被逐幀著色；
+    # 靜態圖 visualize_3d_simulation 保留完整表面
+    # Coarse wireframe in the animation path: plot_surface emits ~900
+    # facets that Agg shades every frame even though the earth is
+    # static; the static plot keeps the full surface
+    ax.plot_wireframe(_EARTH_X, _EARTH_Y, _EARTH_Z, color='lightblue',
+                      alpha=0.1, rcount=12, ccount=12)
+    
+    # 固定視角：blit 需要靜態背景，逐幀旋轉會強制整圖重繪
+    # Static view: blitting needs a stable background
+    ax.view_init(elev=30, azim=45)
+
+    # 繪圖物件只建立一次，逐幀僅更新座標與顏色；
+    # 每幀 remove + 重建 artist 的做法迫使 matplotlib 反覆配置與
+    # 註銷 Path3DCollection，是這類動畫的主要成本
+    # Create the artists once and only update coordinates/colors per
+    # frame, instead of removing and recreating them every tick
+    sat_scatter = ax.scatter([], [], [], c='blue', marker='o', s=200,
+                             edgecolors='darkblue', linewidths=1,
+                             label='LEO 衛星群')
+    uav_scatter = ax.scatter([], [], [], c='orange', marker='^', s=150,
+                             edgecolors='darkorange', linewidths=1,
+                             label='無人機蜂群 (20km)')
+    # 單一 scatter 容納所有地面終端，狀態以顏色呈現（紅=被阻斷）；
+    # 終端位置固定，座標只設定這一次，逐幀僅換顏色
+    gt_scatter = ax.scatter(gt_ecef[:, 0], gt_ecef[:, 1], gt_ecef[:, 2],
+                            marker='o', s=200, linewidths=2,
+                            edgecolors='black')
+    # 干擾鏈路：單一 Line3DCollection 容納所有配對，逐幀只換線段。
+    # 以首幀線段初始化：matplotlib 3.8 起 add_collection3d 會對
+    # 線段列表做 concatenate 自動縮放，空集合直接拋 ValueError；
+    # 無任何 (無人機, 終端) 配對時乾脆不建立此 artist
+    # Seed with the first frame's segments: since matplotlib 3.8,
+    # add_collection3d autoscales by concatenating the segment list and
+    # raises on an empty collection; skip the artist when there are no
+    # (UAV, terminal) pairs at all
+    if soa['uav_pos'].shape[1] > 0 and len(gt_ecef) > 0:
+        links = Line3DCollection(
+            _uav_gt_segments(soa['uav_pos'][0], gt_ecef), colors='red',
+            linestyles='--', alpha=0.2, linewidths=1)
+        ax.add_collection3d(links)
+    else:
+        links = None
+    time_text = ax.text2D(0.02, 0.98, '', transform=ax.transAxes,
                           fontsize=12, verticalalignment='top',
                           bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-    
+
     def animate(frame):
-        nonlocal sat_scatter, uav_scatter, gt_scatters, gt_lines
-        
-        # 清除之前的繪圖對象
-        if sat_scatter is not None:
-            sat_scatter.remove()
-        if uav_scatter is not None:
-            uav_scatter.remove()
-        for scatter in gt_scatters:
-            scatter.remove()
-        for line_group in gt_lines:
-            for line in line_group:
-                line.remove()
-        gt_scatters.clear()
-        gt_lines.clear()
-        
-        # 獲取當前幀的數據
-        result = results[frame]
-        sat_positions = np.array(result['satellite_positions'])
-        uav_positions = result['uav_positions']
-        gt_positions = np.array([gt.get_ecef_coord() for gt in ground_terminals])
-        gt_status = [r['is_jammed'] for r in result['gt_results']]
-        
-        # 繪製衛星
-        sat_scatter = None
-        if len(sat_positions) > 0:
-            sat_scatter = ax.scatter(sat_positions[:, 0], sat_positions[:, 1], 
-                                    sat_positions[:, 2], c='blue', marker='o', 
-                                    s=200, edgecolors='darkblue', linewidths=1,
-                                    label='LEO 衛星群')
-        
-        # 繪製無人機
-        uav_scatter = None
-        if len(uav_positions) > 0:
-            uav_scatter = ax.scatter(uav_positions[:, 0], uav_positions[:, 1], 
-                                    uav_positions[:, 2], c='orange', marker='^', 
-                                    s=150, edgecolors='darkorange', linewidths=1,
-                                    label='無人機蜂群 (20km)')
-        
-        # 繪製地面終端和干擾鏈路
-        for i in range(len(gt_positions)):
-            color = 'red' if gt_status[i] else 'green'
-            marker = 'X' if gt_status[i] else 'o'
-            scatter = ax.scatter(gt_positions[i, 0], gt_positions[i, 1], 
-                               gt_positions[i, 2], c=color, marker=marker, 
-                               s=200, linewidths=2, edgecolors='black')
-            gt_scatters.append(scatter)
-            
-            # 繪製干擾鏈路
-            line_group = []
-            if len(uav_positions) > 0:
-                for uav in uav_positions:
-                    line, = ax.plot([uav[0], gt_positions[i, 0]], 
-                                   [uav[1], gt_positions[i, 1]], 
-                                   [uav[2], gt_positions[i, 2]], 
-                                   color='red', linestyle='--', alpha=0.2, linewidth=1)
-                    line_group.append(line)
-            gt_lines.append(line_group)
-        
+        # 獲取當前幀的數據（SoA 切片，無字典或列表推導）
+        sat_positions = soa['sat_pos'][frame]
+        uav_positions = soa['uav_pos'][frame]
+        gt_status = soa['jammed'][frame]
+
+        # 更新衛星與無人機位置
+        sat_scatter._offsets3d = (sat_positions[:, 0], sat_positions[:, 1],
+                                  sat_positions[:, 2])
+        uav_scatter._offsets3d = (uav_positions[:, 0], uav_positions[:, 1],
+                                  uav_positions[:, 2])
+
+        # 更新地面終端狀態顏色（位置固定，不重設座標）
+        gt_scatter.set_facecolor(np.where(gt_status, 'red', 'green'))
+
+        # 更新干擾鏈路：以廣播組裝 (配對數, 2, 3) 線段張量後一次替換
+        if links is not None:
+            links.set_segments(_uav_gt_segments(uav_positions, gt_ecef))
+
         # 更新時間文本
-        time_text.set_text(f'時間: {result["time"]:.0f} s\n'
-                          f'平均 SINR: {result["avg_sinr"]:.2f} dB\n'
-                          f'阻斷率: {result["jammed_rate"]*100:.1f}%')
-        
-        # 設置視角（可選：讓視角緩慢旋轉）
-        ax.view_init(elev=30, azim=45 + frame * 0.5)
-        
-        # 返回所有可用的繪圖對象
-        return_items = [time_text]
-        if sat_scatter is not None:
-            return_items.append(sat_scatter)
-        if uav_scatter is not None:
-            return_items.append(uav_scatter)
-        return_items.extend(gt_scatters)
-        return return_items
-    
-    # 創建動畫
-    anim = FuncAnimation(fig, animate, frames=len(results), 
-                       interval=interval, blit=False, repeat=True)
-    
-    # 保存動畫
-    print(f"    正在保存動畫到 {save_path}...")
-    anim.save(save_path, writer=PillowWriter(fps=1000//interval))
-    print(f"    ✓ 動畫已保存")
-    
+        time_text.set_text(f'時間: {soa["time"][frame]:.0f} s\n'
+                          f'平均 SINR: {soa["avg_sinr"][frame]:.2f} dB\n'
+                          f'阻斷率: {soa["jammed_rate"][frame]*100:.1f}%')
+
+        artists = [time_text, sat_scatter, uav_scatter, gt_scatter]
+        if links is not None:
+            artists.append(links)
+        return artists
+
+    # 幀數超過上限時等距抽幀：多數動畫在 1/3 幀率下觀感相同，
+    # save() 時間隨幀數線性下降
+    # Decimate frames evenly above the cap; save() time drops linearly
+    stride = max(1, len(results) // max_frames)
+
+    # 保存動畫：相同內容的重跑直接命中磁碟快取；
+    # 否則逐幀串流寫出（imageio 可用時記憶體占用恆定）後入快取。
+    # FuncAnimation 由 _save_animation 僅在後備路徑建立——掛在
+    # 串流 figure 上的動畫會把 artist 標記為 animated，使每幀相同
+    key = _animation_cache_key('3d', title, interval, stride, soa['sinr'],
+                               soa['sat_pos'], soa['uav_pos'], gt_ecef)
+    if _fetch_cached_gif(key, save_path):
+        return None
+
+    # 相鄰幀的「所有」渲染輸入（含文字框的時間/平均 SINR/阻斷率）
+    # 都相同時才跳過重複渲染；摘要少算任何一項都會重放帶著
+    # 過期時鐘的舊影像
+    # Skip only when every rendered input matches, textbox values
+    # included — omitting any would replay a frame with a stale clock
+    anim = _save_animation(fig, animate, range(0, len(results), stride),
+                           save_path, interval,
+                           frame_digest=lambda i: _animation_cache_key(
+                               soa['sat_pos'][i], soa['uav_pos'][i],
+                               soa['jammed'][i], soa['time'][i],
+                               soa['avg_sinr'][i], soa['jammed_rate'][i]))
+    _store_cached_gif(key, save_path)
     return anim
 
 
 def animate_2d_performance(results, ground_terminals,
                           title="地面終端 SINR 性能分佈動畫",
-                          interval=200, save_path='simulation_2d_animation.gif'):
+                          interval=200, save_path='simulation_2d_animation.gif',
+                          max_frames=200, parallel=False):
     """
     生成 2D 性能分佈動畫，顯示 SINR 值隨時間的變化
     Generate 2D performance distribution animation showing SINR changes over time
-    
+
     :param results: 模擬結果列表
     :param ground_terminals: 地面終端列表
     :param title: 動畫標題
     :param interval: 動畫幀間隔（毫秒）
     :param save_path: 保存路徑
-    :return: 動畫對象
+    :param max_frames: 輸出動畫的幀數上限，超過時等距抽幀
+    :param parallel: 以行程池平行渲染各幀後再寫出（需 imageio）；
+        幀彼此獨立，渲染吞吐量約隨核心數擴展
+    :return: PillowWriter 後備路徑的動畫對象；imageio 串流或
+        快取命中時為 None（GIF 已寫出）
     """
-    gt_lon = [gt.longitude for gt in ground_terminals]
-    gt_lat = [gt.latitude for gt in ground_terminals]
-    
+    gt_lon = np.array([gt.longitude for gt in ground_terminals])
+    gt_lat = np.array([gt.latitude for gt in ground_terminals])
+
+    # 整批結果一次轉為 SoA 陣列，animate 回呼內只剩切片索引
+    # Convert results to SoA once; callbacks do slab indexing only
+    soa = _results_to_soa(results)
+
     # 計算所有時間步的 SINR 範圍
-    all_sinr = []
-    for result in results:
-        all_sinr.extend([r['sinr'] for r in result['gt_results']])
-    all_sinr = np.array(all_sinr)
-    vmin, vmax = np.min(all_sinr), np.max(all_sinr)
-    
-    # 創建圖形和軸
-    fig, ax = plt.subplots(figsize=(10, 8))
+    vmin, vmax = soa['sinr'].min(), soa['sinr'].max()
+
+    # 創建圖形和軸（裸 Agg Figure，避開 pyplot 的互動後端與註冊表）
+    fig = Figure(figsize=(10, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    # 標題固定：逐幀改標題會改動 blit 背景，使其每幀重建；
+    # 當前時間已由左上角的文字框呈現
+    # Static title: a per-frame title change would invalidate the blit
+    # background; the current time is shown in the corner textbox
+    ax.set_title(title, fontsize=14, fontweight='bold')
     ax.set_xlabel("經度 (Longitude)", fontsize=11)
     ax.set_ylabel("緯度 (Latitude)", fontsize=11)
     ax.grid(True, alpha=0.3)
-    
+
+    # 終端不移動：經緯度範圍預先固定並關閉自動縮放，
+    # 避免逐幀 set_offsets 觸及資料範圍而強制整圖重繪
+    # Terminals are static: fix lon/lat limits up front and disable
+    # autoscale so per-frame updates never touch the data limits
+    lon_pad = (gt_lon.max() - gt_lon.min()) * 0.05 + 0.01
+    lat_pad = (gt_lat.max() - gt_lat.min()) * 0.05 + 0.01
+    ax.set_xlim(gt_lon.min() - lon_pad, gt_lon.max() + lon_pad)
+    ax.set_ylim(gt_lat.min() - lat_pad, gt_lat.max() + lat_pad)
+    ax.set_autoscale_on(False)
+
     # 設置顏色映射
     norm = plt.Normalize(vmin=vmin, vmax=vmax)
-    cmap = plt.cm.RdYlGn_r
-    
-    # 初始化繪圖對象
-    scatter_plots = []
-    time_text = ax.text(0.02, 0.98, '', transform=ax.transAxes, 
+
+    # 初始化繪圖對象：正常與被阻斷終端各一個持久 scatter
+    # （單次呼叫只支援單一 marker），逐幀僅更新座標與顏色
+    # Two persistent scatters (one marker each), updated per frame
+    ok_scatter = ax.scatter([], [], s=100, marker='o',
+                            edgecolors='black', linewidths=1)
+    jam_scatter = ax.scatter([], [], s=200, marker='X',
+                             edgecolors='black', linewidths=1)
+    time_text = ax.text(0.02, 0.98, '', transform=ax.transAxes,
                         fontsize=12, verticalalignment='top',
                         bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-    
+
     # 添加顏色條
-    sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
+    sm = plt.cm.ScalarMappable(cmap=_SINR_CMAP, norm=norm)
     sm.set_array([])
-    cbar = plt.colorbar(sm, ax=ax, label="SINR (dB)")
+    cbar = fig.colorbar(sm, ax=ax, label="SINR (dB)")
     cbar.ax.tick_params(labelsize=9)
-    
+
     def animate(frame):
-        nonlocal scatter_plots
-        
-        # 清除之前的散點圖
-        for scatter in scatter_plots:
-            scatter.remove()
-        scatter_plots.clear()
-        
-        # 獲取當前幀的數據
-        result = results[frame]
-        sinr_values = [r['sinr'] for r in result['gt_results']]
-        
-        # 繪製每個終端
-        for lon, lat, sinr in zip(gt_lon, gt_lat, sinr_values):
-            color = cmap(norm(sinr))
-            marker_style = 'X' if sinr < -5.0 else 'o'
-            size = 200 if sinr < -5.0 else 100
-            scatter = ax.scatter(lon, lat, c=[color], s=size, marker=marker_style,
-                               edgecolors='black', linewidths=1)
-            scatter_plots.append(scatter)
-        
+        # 獲取當前幀的數據（SoA 切片，無字典或列表推導）
+        sinr_arr = soa['sinr'][frame]
+
+        # 查找表批次取色後依阻斷狀態分派給兩個 scatter
+        colors = _sinr_colors(sinr_arr, vmin, vmax)
+        jammed = sinr_arr < -5.0
+        ok_scatter.set_offsets(
+            np.column_stack([gt_lon[~jammed], gt_lat[~jammed]]))
+        ok_scatter.set_facecolor(colors[~jammed])
+        jam_scatter.set_offsets(
+            np.column_stack([gt_lon[jammed], gt_lat[jammed]]))
+        jam_scatter.set_facecolor(colors[jammed])
+
         # 更新時間文本
-        time_text.set_text(f'時間: {result["time"]:.0f} s\n'
-                          f'平均 SINR: {result["avg_sinr"]:.2f} dB\n'
-                          f'阻斷率: {result["jammed_rate"]*100:.1f}%')
-        
-        ax.set_title(f'{title} - 時間: {result["time"]:.0f} s', 
-                    fontsize=14, fontweight='bold')
-        
-        return scatter_plots + [time_text]
-    
-    # 創建動畫
-    anim = FuncAnimation(fig, animate, frames=len(results), 
-                       interval=interval, blit=False, repeat=True)
-    
-    # 保存動畫
-    print(f"    正在保存動畫到 {save_path}...")
-    anim.save(save_path, writer=PillowWriter(fps=1000//interval))
-    print(f"    ✓ 動畫已保存")
+        time_text.set_text(f'時間: {soa["time"][frame]:.0f} s\n'
+                          f'平均 SINR: {soa["avg_sinr"][frame]:.2f} dB\n'
+                          f'阻斷率: {soa["jammed_rate"][frame]*100:.1f}%')
+
+        return [ok_scatter, jam_scatter, time_text]
     
+    # 幀數超過上限時等距抽幀：多數動畫在 1/3 幀率下觀感相同，
+    # save() 時間隨幀數線性下降
+    # Decimate frames evenly above the cap; save() time drops linearly
+    stride = max(1, len(results) // max_frames)
+
+    # 保存動畫：相同內容的重跑直接命中磁碟快取。平行模式下把每幀
+    # 的小型數據元組發給行程池渲染，主行程只負責依序寫出；否則走
+    # 逐幀串流的共用路徑（FuncAnimation 僅在其後備分支建立）
+    # Cache hit turns a rerun into a file copy. Parallel mode ships
+    # small per-frame state tuples to a process pool and writes results
+    # in order; otherwise use the shared streaming path
+    key = _animation_cache_key('2d', title, interval, stride, soa['sinr'],
+                               gt_lon, gt_lat)
+    anim = None
+    if _fetch_cached_gif(key, save_path):
+        pass
+    elif parallel and IMAGEIO_AVAILABLE:
+        print(f"    正在保存動畫到 {save_path}...")
+        states = [(gt_lon, gt_lat, soa['sinr'][i],
+                   soa['time'][i], soa['avg_sinr'][i],
+                   soa['jammed_rate'][i], vmin, vmax, title)
+                  for i in range(0, len(results), stride)]
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex, \
+                iio.imopen(save_path, 'w', extension='.gif') as out:
+            for frame in ex.map(_render_2d_frame, states):
+                out.write(frame)
+        print(f"    ✓ 動畫已保存")
+        _store_cached_gif(key, save_path)
+    else:
+        # 相鄰幀的「所有」渲染輸入（含文字框的時間/平均 SINR/
+        # 阻斷率）都相同時才跳過重複渲染
+        # Skip only when every rendered input matches, textbox included
+        anim = _save_animation(fig, animate, range(0, len(results), stride),
+                               save_path, interval,
+                               frame_digest=lambda i: _animation_cache_key(
+                                   soa['sinr'][i], soa['time'][i],
+                                   soa['avg_sinr'][i],
+                                   soa['jammed_rate'][i]))
+        _store_cached_gif(key, save_path)
+
     return anim
 
 
-def animate_time_series(results, 
+def animate_time_series(results,
                        title="蜂群干擾效果隨時間變化動畫",
-                       interval=200, save_path='simulation_timeseries_animation.gif'):
+                       interval=200, save_path='simulation_timeseries_animation.gif',
+                       max_frames=200):
     """
     生成時間序列動畫，顯示 SINR 和阻斷率隨時間的變化
     Generate time series animation showing SINR and jammed rate changes
@@ -444,86 +794,86 @@ def animate_time_series(results,
     :param title: 動畫標題
     :param interval: 動畫幀間隔（毫秒）
     :param save_path: 保存路徑
-    :return: 動畫對象
+    :param max_frames: 輸出動畫的幀數上限，超過時等距抽幀
+    :return: PillowWriter 後備路徑的動畫對象；imageio 串流或
+        快取命中時為 None（GIF 已寫出）
     """
-    time_steps = [r['time'] for r in results]
-    avg_sinr = [r['avg_sinr'] for r in results]
-    jammed_rate = [r['jammed_rate'] for r in results]
-    
-    # 創建圖形和軸
-    fig, ax1 = plt.subplots(figsize=(12, 6))
+    # 整批結果一次轉為 SoA 陣列，animate 回呼內只剩切片索引
+    # Convert results to SoA once; callbacks do slab indexing only
+    soa = _results_to_soa(results)
+    time_steps = soa['time']
+    avg_sinr = soa['avg_sinr']
+    jammed_rate = soa['jammed_rate'] * 100
+
+    # 創建圖形和軸（裸 Agg Figure，避開 pyplot 的互動後端與註冊表）
+    fig = Figure(figsize=(12, 6))
+    FigureCanvasAgg(fig)
+    ax1 = fig.add_subplot(111)
+    ax1.set_title(title, fontsize=14, fontweight='bold')
     ax1.set_xlabel('時間 (秒)', fontsize=11)
     ax1.set_ylabel('平均 SINR (dB)', color='tab:blue', fontsize=11)
-    ax1.set_xlim([min(time_steps), max(time_steps)])
-    ax1.set_ylim([min(avg_sinr) * 1.1, max(avg_sinr) * 0.9])
+    ax1.set_xlim([time_steps.min(), time_steps.max()])
+    ax1.set_ylim([avg_sinr.min() * 1.1, avg_sinr.max() * 0.9])
     ax1.grid(True, alpha=0.3)
-    ax1.axhline(y=-5.0, color='red', linestyle='--', alpha=0.5, 
+    ax1.axhline(y=-5.0, color='red', linestyle='--', alpha=0.5,
                label='阻斷閾值 (-5 dB)')
-    
+
     ax2 = ax1.twinx()
     ax2.set_ylabel('阻斷率 (%)', color='tab:red', fontsize=11)
     ax2.set_ylim(0, 100)
-    
-    # 初始化繪圖對象
-    line1 = None
-    line2 = None
-    marker1 = None
-    marker2 = None
-    
+
+    # 兩軸範圍已涵蓋整段時間序列，關閉自動縮放以免逐幀
+    # set_data 觸及資料範圍而使 blit 失效
+    # Limits already cover the whole series; disable autoscale so
+    # per-frame set_data never invalidates the blit background
+    ax1.set_autoscale_on(False)
+    ax2.set_autoscale_on(False)
+
+    # 初始化繪圖對象：線條與高亮標記只建立一次，逐幀以 set_data /
+    # set_offsets 餵入截至當前幀的資料；每幀重建整條線會使總工作量
+    # 隨幀數平方成長
+    # Persistent artists fed via set_data/set_offsets; recreating the
+    # full line each frame makes total work quadratic in frame count
+    line1, = ax1.plot([], [], color='tab:blue', label='平均 SINR',
+                      linewidth=2, marker='o', markersize=4)
+    line2, = ax2.plot([], [], color='tab:red', linestyle='--',
+                      label='阻斷率', linewidth=2, marker='s', markersize=4)
+    marker1 = ax1.scatter([], [], color='tab:blue', s=200, zorder=5,
+                          edgecolors='black', linewidths=2)
+    marker2 = ax2.scatter([], [], color='tab:red', s=200, zorder=5,
+                          edgecolors='black', linewidths=2, marker='s')
+
+    # 圖例固定，建立一次即可
+    lines = [line1, line2]
+    ax1.legend(lines, [l.get_label() for l in lines],
+               loc='upper left', fontsize=9)
+
     def animate(frame):
-        nonlocal line1, line2, marker1, marker2
-        
-        # 清除之前的線條和標記
-        if line1 is not None:
-            line1.remove()
-        if line2 is not None:
-            line2.remove()
-        if marker1 is not None:
-            marker1.remove()
-        if marker2 is not None:
-            marker2.remove()
-        
-        # 獲取當前幀之前的數據
-        current_time = time_steps[frame]
-        time_data = time_steps[:frame+1]
-        sinr_data = avg_sinr[:frame+1]
-        rate_data = [r * 100 for r in jammed_rate[:frame+1]]
-        
-        # 繪製線條
-        line1, = ax1.plot(time_data, sinr_data, color='tab:blue', 
-                         label='平均 SINR', linewidth=2, marker='o', markersize=4)
-        line2, = ax2.plot(time_data, rate_data, color='tab:red', 
-                         linestyle='--', label='阻斷率', linewidth=2, 
-                         marker='s', markersize=4)
-        
-        # 繪製當前點的高亮標記
-        marker1 = ax1.scatter([current_time], [avg_sinr[frame]], 
-                            color='tab:blue', s=200, zorder=5, 
-                            edgecolors='black', linewidths=2)
-        marker2 = ax2.scatter([current_time], [rate_data[-1]], 
-                            color='tab:red', s=200, zorder=5, 
-                            edgecolors='black', linewidths=2, marker='s')
-        
-        # 更新標題
-        result = results[frame]
-        ax1.set_title(f'{title} - 時間: {result["time"]:.0f} s', 
-                     fontsize=14, fontweight='bold')
-        
-        # 更新圖例
-        lines = [line1, line2]
-        labels = [l.get_label() for l in lines]
-        ax1.legend(lines, labels, loc='upper left', fontsize=9)
-        
+        # 餵入截至當前幀的歷史資料
+        line1.set_data(time_steps[:frame+1], avg_sinr[:frame+1])
+        line2.set_data(time_steps[:frame+1], jammed_rate[:frame+1])
+
+        # 高亮當前點
+        marker1.set_offsets([[time_steps[frame], avg_sinr[frame]]])
+        marker2.set_offsets([[time_steps[frame], jammed_rate[frame]]])
+
         return [line1, line2, marker1, marker2]
-    
-    # 創建動畫
-    anim = FuncAnimation(fig, animate, frames=len(results), 
-                       interval=interval, blit=False, repeat=True)
-    
-    # 保存動畫
-    print(f"    正在保存動畫到 {save_path}...")
-    anim.save(save_path, writer=PillowWriter(fps=1000//interval))
-    print(f"    ✓ 動畫已保存")
-    
+
+    # 幀數超過上限時等距抽幀：多數動畫在 1/3 幀率下觀感相同，
+    # save() 時間隨幀數線性下降
+    # Decimate frames evenly above the cap; save() time drops linearly
+    stride = max(1, len(results) // max_frames)
+
+    # 保存動畫：相同內容的重跑直接命中磁碟快取；
+    # 否則逐幀串流寫出（imageio 可用時記憶體占用恆定）後入快取。
+    # FuncAnimation 由 _save_animation 僅在後備路徑建立
+    key = _animation_cache_key('ts', title, interval, stride,
+                               time_steps, avg_sinr, jammed_rate)
+    if _fetch_cached_gif(key, save_path):
+        return None
+
+    anim = _save_animation(fig, animate, range(0, len(results), stride),
+                           save_path, interval)
+    _store_cached_gif(key, save_path)
     return anim
 